@@ -0,0 +1 @@
+"""Restocks.net client benchmarks"""
\ No newline at end of file
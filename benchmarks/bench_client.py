@@ -0,0 +1,232 @@
+"""Measures the client throughput and latency against the local stand-in server.
+
+Usage: python -m benchmarks.bench_client [--operations N] [--workers W] [--latency MS] [--jitter MS]
+                                         [--error-rate R] [--parse-workers P] [--modes serial threaded async]
+                                         [--scenarios ...]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+from restocks.client import AsyncClient, Client
+from restocks.executor import ParseExecutor
+from restocks.filters import ListingDuration, SellMethod
+from restocks.scheduler import RequestScheduler
+
+from .server import MockServer
+
+SKU = "FD1437-612"
+
+SCENARIOS: dict[str, Callable[[Any, int], Any]] = {
+    "search_products": lambda client, i: client.search_products("jordan", 1 + i % 10),
+    "get_product": lambda client, i: client.get_product(SKU),
+    "sales_history": lambda client, i: client.get_sales_history(page=1 + i % 3),
+    "listings_history": lambda client, i: client.get_listings_history(page=1 + i % 3),
+    "list_product": lambda client, i: client.list_product(SKU, 200 + i, "42", SellMethod.Resell, ListingDuration.Days60),
+    "edit_listing": lambda client, i: client.edit_listing(1000 + i, 200 + i),
+}
+
+LOGGED_IN = {"sales_history", "listings_history", "list_product", "edit_listing"}
+
+
+def _client_kwargs(args: argparse.Namespace) -> dict:
+
+    # injected errors are retried quickly, so the numbers show the retry overhead rather than failures
+    scheduler = RequestScheduler(retries=10, backoff=0.01, adaptive=False) if args.error_rate else None
+
+    return {"pool_size": max(args.workers, 16), "scheduler": scheduler, "parse_executor": args.parse_executor}
+
+
+def _use_server(client: Any, server: MockServer) -> None:
+
+    client._base_url = server.url
+
+    # product slugs are restocks.net urls, their pages are fetched from the stand-in at the same path
+    product_request = client._product_request
+    client._product_request = lambda slug: product_request(server.url + urlparse(slug).path)
+
+
+class _Errors:
+
+    """
+    Error injection is paused while logging in, the benchmarks measure the operations only.
+    """
+
+    def __init__(self, server: MockServer) -> None:
+
+        self.server = server
+        self.rate = server.error_rate
+
+    def __enter__(self) -> None:
+
+        self.server.error_rate = 0
+
+    def __exit__(self, *args) -> None:
+
+        self.server.error_rate = self.rate
+
+
+def _timed(operation: Callable[[], Any]) -> tuple[float, bool]:
+
+    start = time.perf_counter()
+
+    try:
+
+        operation()
+
+    except Exception:
+
+        return time.perf_counter() - start, False
+
+    return time.perf_counter() - start, True
+
+
+def _serial(server: MockServer, scenario: str, args: argparse.Namespace) -> tuple[list[tuple[float, bool]], float]:
+
+    client = Client(**_client_kwargs(args))
+    _use_server(client, server)
+
+    if scenario in LOGGED_IN:
+
+        with _Errors(server):
+
+            client.login("bench@restocks.net", "password")
+
+    wall = time.perf_counter()
+
+    results = [_timed(lambda: SCENARIOS[scenario](client, i)) for i in range(args.operations)]
+
+    wall = time.perf_counter() - wall
+
+    client.close()
+
+    return results, wall
+
+
+def _threaded(server: MockServer, scenario: str, args: argparse.Namespace) -> tuple[list[tuple[float, bool]], float]:
+
+    client = Client(**_client_kwargs(args))
+    _use_server(client, server)
+
+    if scenario in LOGGED_IN:
+
+        with _Errors(server):
+
+            client.login("bench@restocks.net", "password")
+
+    def run(i: int) -> tuple[float, bool]:
+
+        return _timed(lambda: SCENARIOS[scenario](client, i))
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+
+        wall = time.perf_counter()
+
+        results = list(executor.map(run, range(args.operations)))
+
+        wall = time.perf_counter() - wall
+
+    client.close()
+
+    return results, wall
+
+
+def _async(server: MockServer, scenario: str, args: argparse.Namespace) -> tuple[list[tuple[float, bool]], float]:
+
+    async def main() -> tuple[list[tuple[float, bool]], float]:
+
+        async with AsyncClient(**_client_kwargs(args)) as client:
+
+            _use_server(client, server)
+
+            if scenario in LOGGED_IN:
+
+                with _Errors(server):
+
+                    await client.login("bench@restocks.net", "password")
+
+            semaphore = asyncio.Semaphore(args.workers)
+
+            async def run(i: int) -> tuple[float, bool]:
+
+                async with semaphore:
+
+                    start = time.perf_counter()
+
+                    try:
+
+                        await SCENARIOS[scenario](client, i)
+
+                    except Exception:
+
+                        return time.perf_counter() - start, False
+
+                    return time.perf_counter() - start, True
+
+            wall = time.perf_counter()
+
+            results = await asyncio.gather(*(run(i) for i in range(args.operations)))
+
+            return results, time.perf_counter() - wall
+
+    return asyncio.run(main())
+
+
+MODES = {"serial": _serial, "threaded": _threaded, "async": _async}
+
+
+def _percentile(values: list[float], q: float) -> float:
+
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16, help="threads or concurrent coroutines")
+    parser.add_argument("--latency", type=float, default=20, help="server latency in ms")
+    parser.add_argument("--jitter", type=float, default=5, help="maximum random extra server latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of 503 responses")
+    parser.add_argument("--parse-workers", type=int, default=0, help="worker processes parsing the pages, 0 parses in process")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    args.parse_executor = ParseExecutor(args.parse_workers) if args.parse_workers else None
+
+    server = MockServer(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate).start()
+
+    print(f"{'scenario':<18}{'mode':<10}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+
+    try:
+
+        for scenario in args.scenarios:
+
+            for mode in args.modes:
+
+                results, wall = MODES[mode](server, scenario, args)
+
+                latencies = [latency for latency, ok in results]
+
+                print(f"{scenario:<18}{mode:<10}{len(results) / wall:>10.1f}"
+                      f"{_percentile(latencies, 50) * 1000:>10.2f}{_percentile(latencies, 95) * 1000:>10.2f}"
+                      f"{_percentile(latencies, 99) * 1000:>10.2f}{sum(not ok for _, ok in results):>8}")
+
+    finally:
+
+        server.stop()
+
+        if args.parse_executor is not None:
+
+            args.parse_executor.close()
+
+
+if __name__ == "__main__":
+
+    main()
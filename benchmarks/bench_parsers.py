@@ -0,0 +1,57 @@
+"""Compares the HTML parser backends on the saved fixture pages.
+
+Usage: python -m benchmarks.bench_parsers [--number N]
+"""
+
+import argparse
+import json
+import os
+import timeit
+
+from restocks.client.parsers import LxmlParser, SoupParser
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _load(name: str) -> str:
+
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+
+        src = f.read()
+
+    return json.loads(src)["products"] if name.endswith(".json") else src
+
+
+CASES = [
+    ("csrf_token", "login.html"),
+    ("product", "product.html"),
+    ("sales_history", "sales_history.json"),
+    ("listings_history", "listings_history.json"),
+]
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'method':<18}{'soup ms':>10}{'lxml ms':>10}{'speedup':>10}")
+
+    for method, fixture in CASES:
+
+        src = _load(fixture)
+
+        soup, lxml = getattr(SoupParser, method), getattr(LxmlParser, method)
+
+        assert soup(src) == lxml(src), f"{method} output differs between parsers"
+
+        soup_time = timeit.timeit(lambda: soup(src), number=args.number) / args.number * 1000
+        lxml_time = timeit.timeit(lambda: lxml(src), number=args.number) / args.number * 1000
+
+        print(f"{method:<18}{soup_time:>10.3f}{lxml_time:>10.3f}{soup_time / lxml_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+
+    main()
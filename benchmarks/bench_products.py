@@ -0,0 +1,79 @@
+"""Measures the conversion of parsed rows into products, with the memoized helpers cold and warm.
+
+Usage: python -m benchmarks.bench_products [--rows N] [--repeat R]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import time
+
+from restocks.client import Client
+from restocks.product import Product, _image_to_sku, _image_to_slug, _parse_date
+from restocks.utils.helpers import parse_size
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _load(name: str):
+
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+
+        return json.load(f)
+
+
+def _rows(count: int) -> list[dict]:
+
+    client = Client()
+
+    samples = (_load("search.json")["data"]
+               + client._sales_history_parsing(_load("sales_history.json")["products"])
+               + client._listings_history_parsing(_load("listings_history.json")["products"]))
+
+    return list(itertools.islice(itertools.cycle(samples), count))
+
+
+def _clear() -> None:
+
+    for memo in (_image_to_slug, _image_to_sku, _parse_date, parse_size):
+
+        memo.cache_clear()
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+
+    print(f"{'memo':<6}{'median ms':>12}{'us / row':>10}")
+
+    for cold in (True, False):
+
+        times = []
+
+        for _ in range(args.repeat):
+
+            if cold:
+
+                _clear()
+
+            start = time.perf_counter()
+
+            Product._from_json_many(rows)
+
+            times.append(time.perf_counter() - start)
+
+        median = statistics.median(times)
+
+        print(f"{'cold' if cold else 'warm':<6}{median * 1000:>12.2f}{median / len(rows) * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+
+    main()
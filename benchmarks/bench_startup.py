@@ -0,0 +1,55 @@
+"""Measures the cold start of short lived processes using the client, each case in a fresh interpreter.
+
+Usage: python -m benchmarks.bench_startup [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ("interpreter", "pass"),
+    ("import", "import restocks.client"),
+    ("Client()", "from restocks.client import Client; Client()"),
+    ("AsyncClient()", "from restocks.client import AsyncClient; AsyncClient()"),
+    ("first parse", "from restocks.client import Client; Client()._product_parsing(open('benchmarks/fixtures/product.html').read())"),
+]
+
+
+def _run(code: str) -> float:
+
+    start = time.perf_counter()
+
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'case':<16}{'median ms':>12}{'min ms':>10}{'over interpreter ms':>22}")
+
+    baseline = None
+
+    for name, code in CASES:
+
+        times = [_run(code) for _ in range(args.runs)]
+
+        median = statistics.median(times)
+        baseline = median if baseline is None else baseline
+
+        print(f"{name:<16}{median * 1000:>12.1f}{min(times) * 1000:>10.1f}{(median - baseline) * 1000:>22.1f}")
+
+
+if __name__ == "__main__":
+
+    main()
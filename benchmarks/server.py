@@ -0,0 +1,260 @@
+"""Local stand-in for the Restocks.net endpoints the client uses, serving the saved fixtures.
+
+Usage: python -m benchmarks.server [--port P] [--latency MS] [--jitter MS] [--error-rate R]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+SESSION_COOKIE = "restocks_session"
+
+
+def _read(name: str) -> str:
+
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+
+        return f.read()
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    # headers and body are written separately, delayed ACKs would otherwise add ~40ms per response
+    disable_nagle_algorithm = True
+
+    server: "MockServer"
+
+    def log_message(self, *args) -> None:
+
+        pass
+
+    def _reply(self, status: int, body: str, content_type: str = "application/json", headers: dict = None) -> None:
+
+        data = body.encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+
+        for name, value in (headers or {}).items():
+
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self, method: str) -> None:
+
+        length = int(self.headers.get("Content-Length") or 0)
+
+        if length:
+
+            self.rfile.read(length)
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        # the locale redirect makes the client base url end with /en, and the login flow appends paths to it
+        path = re.sub(r"^/en(?=/|$)", "", re.sub(r"/+", "/", url.path)).rstrip("/") or "/"
+
+        self.server._delay()
+
+        if self.server._fail():
+
+            return self._reply(503, "unavailable", "text/plain", {"Retry-After": "0"})
+
+        logged_in = f"{SESSION_COOKIE}=" in (self.headers.get("Cookie") or "")
+
+        match method, path:
+
+            case "GET", "/":
+
+                if not url.path.startswith("/en"):
+
+                    return self._reply(302, "", "text/html", {"Location": "/en"})
+
+                return self._reply(200, self.server.login_page, "text/html")
+
+            case "GET", "/login":
+
+                return self._reply(200, self.server.login_page, "text/html")
+
+            case "POST", "/login":
+
+                return self._reply(200, self.server.login_success, "text/html", {"Set-Cookie": f"{SESSION_COOKIE}=1; Path=/"})
+
+            case "GET", "/shop/search":
+
+                return self._reply(200, self.server.search)
+
+            case "GET", _ if path.startswith("/p/"):
+
+                return self._reply(200, self.server.product_page, "text/html")
+
+            case "GET", _ if path.startswith("/product/get-lowest-price/"):
+
+                return self._reply(200, self.server.lowest_price, "text/html")
+
+            case _ if path.startswith("/account/") and not logged_in:
+
+                return self._reply(302, "", "text/html", {"Location": "/en/login"})
+
+            case "GET", "/account/sales/history":
+
+                return self._reply(200, self.server._history(self.server.sales_history, query))
+
+            case "GET", _ if path.startswith("/account/listings/"):
+
+                return self._reply(200, self.server._history(self.server.listings_history, query))
+
+            case "POST", "/pricing":
+
+                return self._reply(200, self.server.pricing)
+
+            case "POST", "/account/sell/validate":
+
+                return self._reply(200, self.server.sell_validate)
+
+            case "POST", "/account/sell/create":
+
+                return self._reply(200, self.server.sell_create)
+
+            case "POST", "/account/listings/edit":
+
+                return self._reply(200, self.server.listing_edit)
+
+            case "POST", "/account/listings/delete":
+
+                return self._reply(200, self.server.listing_delete)
+
+        self._reply(404, "not found", "text/plain")
+
+    def do_GET(self) -> None:
+
+        self._route("GET")
+
+    def do_POST(self) -> None:
+
+        self._route("POST")
+
+
+class MockServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    request_queue_size = 1024
+
+    def __init__(self, port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, history_pages: int = 3) -> None:
+        """
+        Serves the fixtures on localhost with an injected latency and error rate.
+
+        Args:
+            port: the port to listen on. Defaults to 0, a free port.
+            latency: the delay in seconds added to every response.
+            jitter: the maximum random delay in seconds added on top of the latency.
+            error_rate: the share of requests answered with a 503.
+            history_pages: the number of pages of the sales and listings histories.
+        """
+
+        super().__init__(("127.0.0.1", port), _Handler)
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.history_pages = history_pages
+
+        self.login_page = _read("login.html")
+        self.login_success = _read("login_success.html")
+        self.product_page = _read("product.html")
+        self.search = _read("search.json")
+        self.sales_history = json.loads(_read("sales_history.json"))["products"]
+        self.listings_history = json.loads(_read("listings_history.json"))["products"]
+        self.history_empty = _read("history_empty.json")
+        self.lowest_price = _read("lowest_price.txt")
+        self.pricing = _read("pricing.json")
+        self.sell_validate = _read("sell_validate.json")
+        self.sell_create = _read("sell_create.json")
+        self.listing_edit = _read("listing_edit.json")
+        self.listing_delete = _read("listing_delete.json")
+
+    @property
+    def url(self) -> str:
+
+        # a host name rather than the address, cookie jars drop the cookies set by ip address hosts
+        return f"http://localhost:{self.server_address[1]}"
+
+    def start(self) -> "MockServer":
+
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self) -> None:
+
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address) -> None:
+
+        # clients dropping keep-alive connections are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+
+            super().handle_error(request, client_address)
+
+    def _delay(self) -> None:
+
+        if self.latency or self.jitter:
+
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def _fail(self) -> bool:
+
+        return random.random() < self.error_rate
+
+    def _history(self, src: str, query: dict) -> str:
+
+        page = int(query.get("page", ["1"])[0])
+
+        if page > self.history_pages:
+
+            return self.history_empty
+
+        return json.dumps({"products": src})
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="added latency in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="maximum random extra latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of 503 responses")
+    args = parser.parse_args()
+
+    server = MockServer(args.port, args.latency / 1000, args.jitter / 1000, args.error_rate)
+
+    print(f"serving on {server.url}")
+
+    try:
+
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+
+        server.server_close()
+
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,339 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .product import _image_to_slug, _image_to_sku
+from .utils.helpers import parse_int
+
+DEFAULT_TTL = {"search": 300, "product": 60, "lowest_price": 30}
+
+
+class CacheBackend(ABC):
+
+    """
+    Base class for the response cache storages. Values are stored with an expiration time in seconds. The SKU
+    index, locating the product and price entries of each SKU, is stored apart from them and does not expire.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+
+        pass
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+
+        pass
+
+    @abstractmethod
+    def get_sku(self, sku: str) -> Optional[dict]:
+
+        pass
+
+    @abstractmethod
+    def set_sku(self, sku: str, value: dict) -> None:
+
+        pass
+
+    @abstractmethod
+    def delete_sku(self, sku: str) -> None:
+
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+
+        pass
+
+
+class MemoryCache(CacheBackend):
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        In-memory LRU cache storage.
+
+        Args:
+            maxsize: the maximum number of stored responses. Defaults to 1024.
+        """
+
+        self.maxsize = maxsize
+
+        self._data = OrderedDict()
+        self._skus = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+
+        with self._lock:
+
+            entry = self._data.get(key)
+
+            if entry is None:
+
+                return None
+
+            expires, value = entry
+
+            if expires < time.time():
+
+                del self._data[key]
+
+                return None
+
+            self._data.move_to_end(key)
+
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+
+        with self._lock:
+
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+
+        with self._lock:
+
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+
+        with self._lock:
+
+            for key in [k for k in self._data if k.startswith(prefix)]:
+
+                del self._data[key]
+
+    def get_sku(self, sku: str) -> Optional[dict]:
+
+        with self._lock:
+
+            return self._skus.get(sku)
+
+    def set_sku(self, sku: str, value: dict) -> None:
+
+        with self._lock:
+
+            self._skus[sku] = value
+
+    def delete_sku(self, sku: str) -> None:
+
+        with self._lock:
+
+            self._skus.pop(sku, None)
+
+    def clear(self) -> None:
+
+        with self._lock:
+
+            self._data.clear()
+            self._skus.clear()
+
+
+class SQLiteCache(CacheBackend):
+
+    def __init__(self, path: str = "restocks-cache.sqlite", maxsize: int = 100_000) -> None:
+        """
+        On-disk LRU cache storage backed by sqlite, shared across restarts.
+
+        Args:
+            path: the database file path. Defaults to "restocks-cache.sqlite".
+            maxsize: the maximum number of stored responses. Defaults to 100000.
+        """
+
+        self.maxsize = maxsize
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        with self._conn:
+
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS skus (sku TEXT PRIMARY KEY, value TEXT)")
+
+    def get(self, key: str) -> Optional[Any]:
+
+        now = time.time()
+
+        with self._lock, self._conn:
+
+            row = self._conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+
+                return None
+
+            if row[1] < now:
+
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+                return None
+
+            self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+
+        now = time.time()
+
+        with self._lock, self._conn:
+
+            self._conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                               (key, json.dumps(value), now + ttl, now))
+
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+            if count > self.maxsize:
+
+                self._conn.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                                   (count - self.maxsize,))
+
+    def delete(self, key: str) -> None:
+
+        with self._lock, self._conn:
+
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix: str) -> None:
+
+        with self._lock, self._conn:
+
+            self._conn.execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def get_sku(self, sku: str) -> Optional[dict]:
+
+        with self._lock:
+
+            row = self._conn.execute("SELECT value FROM skus WHERE sku = ?", (sku,)).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set_sku(self, sku: str, value: dict) -> None:
+
+        with self._lock, self._conn:
+
+            self._conn.execute("INSERT OR REPLACE INTO skus VALUES (?, ?)", (sku, json.dumps(value)))
+
+    def delete_sku(self, sku: str) -> None:
+
+        with self._lock, self._conn:
+
+            self._conn.execute("DELETE FROM skus WHERE sku = ?", (sku,))
+
+    def clear(self) -> None:
+
+        with self._lock, self._conn:
+
+            self._conn.execute("DELETE FROM cache")
+            self._conn.execute("DELETE FROM skus")
+
+    def close(self) -> None:
+
+        self._conn.close()
+
+
+class ResponseCache:
+
+    def __init__(self, backend: CacheBackend = None, ttl: dict = None) -> None:
+        """
+        Caches the product search, product page and size lowest price responses of a client.
+
+        Args:
+            backend: the storage to use. Defaults to a `MemoryCache`.
+            ttl: the time to live in seconds of each endpoint responses, keyed by "search", "product" and
+            "lowest_price". Endpoints with a falsy time to live are not cached. Defaults to `DEFAULT_TTL`.
+        """
+
+        self.backend = backend or MemoryCache()
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+
+        self._counters = {endpoint: {"hits": 0, "misses": 0} for endpoint in self.ttl}
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> dict:
+        """
+        The hits and misses counters of each endpoint.
+        """
+
+        with self._lock:
+
+            return {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+
+    def get(self, endpoint: str, key: str) -> Optional[Any]:
+
+        if not self.ttl.get(endpoint):
+
+            return None
+
+        value = self.backend.get(f"{endpoint}:{key}")
+
+        with self._lock:
+
+            self._counters[endpoint]["misses" if value is None else "hits"] += 1
+
+        return value
+
+    def set(self, endpoint: str, key: str, value: Any) -> None:
+
+        if not self.ttl.get(endpoint):
+
+            return
+
+        self.backend.set(f"{endpoint}:{key}", value, self.ttl[endpoint])
+
+        if endpoint == "search":
+
+            # remembers where every found sku lives so `invalidate` can reach its product and price entries, apart
+            # from the responses so the index neither takes their room nor gets evicted before them
+            for product in value.get("data") or []:
+
+                self.backend.set_sku(_image_to_sku(product["image"]),
+                                     {"slug": _image_to_slug(product["image"]), "id": parse_int(str(product["id"]))})
+
+    def invalidate(self, sku: str) -> None:
+        """
+        Removes all the cached responses of a product.
+
+        Args:
+            sku: the product SKU code.
+        """
+
+        self.backend.delete_prefix(f"search:{sku}:")
+
+        product = self.backend.get_sku(sku)
+
+        if product:
+
+            self.backend.delete(f"product:{product['slug']}")
+            self.backend.delete_prefix(f"lowest_price:{product['id']}:")
+            self.backend.delete_sku(sku)
+
+    def clear(self) -> None:
+        """
+        Removes all the cached responses.
+        """
+
+        self.backend.clear()
@@ -0,0 +1,269 @@
+import bisect
+import difflib
+import sqlite3
+import threading
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from .product import _image_to_slug, _image_to_sku
+from .utils.helpers import parse_int
+
+
+class CatalogEntry(NamedTuple):
+
+    sku: str
+    id: Optional[int]
+    slug: str
+    name: str
+    image: str
+    price: Optional[int]
+
+
+def _normalize(text: str) -> str:
+
+    return " ".join(text.lower().split())
+
+
+class CatalogIndex:
+
+    def __init__(self, path: str = "restocks-catalog.sqlite", max_age: Optional[float] = 86400) -> None:
+        """
+        Local sqlite index of the products seen in the search results and history pages of the clients it is given
+        to, resolving SKUs without a search request. The index is loaded in memory, so lookups take microseconds.
+
+        Args:
+            path: the database file path, or ":memory:" for an index kept only in memory. Defaults to
+            "restocks-catalog.sqlite".
+            max_age: the seconds after which a product not seen again is no longer returned by `get`, so the
+            clients search it again and refresh its price. Defaults to a day, None keeps the products forever.
+        """
+
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        with self._conn:
+
+            self._conn.execute("CREATE TABLE IF NOT EXISTS catalog "
+                               "(sku TEXT PRIMARY KEY, id INTEGER, slug TEXT, name TEXT, image TEXT, price INTEGER, updated REAL)")
+
+        # keyed by the upper case SKU code, lookups are case insensitive
+        self._entries: dict[str, CatalogEntry] = {}
+        self._updated: dict[str, float] = {}
+
+        for *row, updated in self._conn.execute("SELECT sku, id, slug, name, image, price, updated FROM catalog"):
+
+            self._entries[row[0].upper()] = CatalogEntry(*row)
+            self._updated[row[0].upper()] = updated
+
+        # sorted lookup lists, rebuilt by the first lookup after a change
+        self._keys: Optional[list[tuple[str, str]]] = None
+        self._words: dict[str, set[str]] = {}
+        self._vocabulary: list[str] = []
+
+    def __len__(self) -> int:
+
+        return len(self._entries)
+
+    def update(self, rows: Iterable[dict]) -> int:
+        """
+        Stores the products of parsed search or history rows. Known products keep their id and price when the rows do not
+        carry them.
+
+        Args:
+            rows: the parsed rows, with their "name" and "image", and optionally their product "id" and lowest
+            "storeprice".
+
+        Returns:
+            The number of added or changed products.
+        """
+
+        changed, refreshed = [], []
+        seen = set()
+        now = time.time()
+
+        with self._lock:
+
+            for row in rows:
+
+                image = row["image"]
+                sku = _image_to_sku(image)
+                key = sku.upper()
+
+                # the first row of a SKU is its best search match, as picked by `get_product`
+                if key in seen:
+
+                    continue
+
+                seen.add(key)
+                known = self._entries.get(key)
+
+                id = parse_int(str(row["id"])) if row.get("id") else None
+                price = parse_int(row["storeprice"]) if row.get("storeprice") else None
+
+                entry = CatalogEntry(sku, id if id is not None else known and known.id, _image_to_slug(image), row["name"],
+                                     image, price if price is not None else known and known.price)
+
+                if entry != known:
+
+                    self._entries[key] = entry
+                    self._updated[key] = now
+
+                    changed.append(entry)
+
+                # unchanged products are confirmed once they are half way to expiring, not on every sighting
+                elif self.max_age is not None and now - self._updated[key] > self.max_age / 2:
+
+                    self._updated[key] = now
+
+                    refreshed.append(entry.sku)
+
+            if changed:
+
+                self._keys = None
+
+            if changed or refreshed:
+
+                with self._conn:
+
+                    self._conn.executemany("INSERT OR REPLACE INTO catalog VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                           [(*entry, now) for entry in changed])
+                    self._conn.executemany("UPDATE catalog SET updated = ? WHERE sku = ?", [(now, sku) for sku in refreshed])
+
+        return len(changed)
+
+    def get(self, sku: str) -> Optional[CatalogEntry]:
+        """
+        Gets a product by its exact SKU code, case insensitively. Products not seen for longer than `max_age` are
+        not returned.
+        """
+
+        key = sku.strip().upper()
+
+        return self._entries.get(key) if self._fresh(key, time.time()) else None
+
+    def prefix(self, text: str, limit: int = 10) -> list[CatalogEntry]:
+        """
+        Gets the products whose SKU code or name starts with a text, case insensitively. Products not seen for
+        longer than `max_age` are not returned.
+
+        Args:
+            text: the start of the SKU codes or names.
+            limit: the maximum number of products returned. Defaults to 10.
+
+        Returns:
+            The matching products, ordered by SKU code or name.
+        """
+
+        keys = self._index()[0]
+
+        text = _normalize(text)
+        now = time.time()
+
+        found = {}
+
+        for key, sku in keys[bisect.bisect_left(keys, (text, "")):]:
+
+            if not key.startswith(text) or len(found) >= limit:
+
+                break
+
+            if self._fresh(sku, now):
+
+                found.setdefault(sku, self._entries[sku])
+
+        return list(found.values())
+
+    def search(self, query: str, limit: int = 10, cutoff: float = 0.6) -> list[CatalogEntry]:
+        """
+        Searches the products by name, tolerating typos, partial words and missing words. Products not seen for
+        longer than `max_age` are not returned.
+
+        Args:
+            query: the name to search.
+            limit: the maximum number of products returned. Defaults to 10.
+            cutoff: the minimum share of the query words, weighted by their similarity, a name must match.
+            Defaults to 0.6.
+
+        Returns:
+            The matching products, best matches first.
+        """
+
+        _, words, vocabulary = self._index()
+
+        tokens = _normalize(query).split()
+
+        scores: dict[str, float] = {}
+
+        for token in tokens:
+
+            matches = {}
+
+            # whole words and words the token starts, as typed so far
+            for word in vocabulary[bisect.bisect_left(vocabulary, token):]:
+
+                if not word.startswith(token):
+
+                    break
+
+                matches[word] = 1.0 if word == token else 0.9
+
+            if not matches:
+
+                for word in difflib.get_close_matches(token, vocabulary, n=3, cutoff=0.75):
+
+                    matches[word] = difflib.SequenceMatcher(None, token, word).ratio()
+
+            best: dict[str, float] = {}
+
+            for word, similarity in matches.items():
+
+                for sku in words[word]:
+
+                    best[sku] = max(best.get(sku, 0.0), similarity)
+
+            for sku, similarity in best.items():
+
+                scores[sku] = scores.get(sku, 0.0) + similarity / len(tokens)
+
+        # shorter names match the query more closely on equal scores
+        now = time.time()
+
+        ranked = sorted((sku for sku, score in scores.items() if score >= cutoff and self._fresh(sku, now)),
+                        key=lambda sku: (-scores[sku], len(self._entries[sku].name), sku))
+
+        return [self._entries[sku] for sku in ranked[:limit]]
+
+    def _fresh(self, key: str, now: float) -> bool:
+
+        return key in self._entries and (self.max_age is None or now - self._updated[key] <= self.max_age)
+
+    def _index(self) -> tuple[list[tuple[str, str]], dict[str, set[str]], list[str]]:
+
+        with self._lock:
+
+            if self._keys is None:
+
+                keys, words = [], {}
+
+                for sku, entry in self._entries.items():
+
+                    name = _normalize(entry.name)
+
+                    keys.append((sku.lower(), sku))
+                    keys.append((name, sku))
+
+                    for word in name.split():
+
+                        words.setdefault(word, set()).add(sku)
+
+                keys.sort()
+
+                self._keys, self._words, self._vocabulary = keys, words, sorted(words)
+
+            return self._keys, self._words, self._vocabulary
+
+    def close(self) -> None:
+
+        self._conn.close()
@@ -1,3 +1,20 @@
 """Restocks.net client initializer"""
 
-from .client import Client
\ No newline at end of file
+from .client import Client
+from .batch import BatchResult
+from .matrix import PriceMatrix
+from .sessions import SessionManager
+from .repricer import PricingRule, Repricer, RepriceResult
+from .monitor import AsyncMonitor, ChangeKind, Monitor, PriceChange
+
+
+def __getattr__(name: str):
+
+    # the async client imports aiohttp, which is slow to import and only needed when it is used
+    if name == "AsyncClient":
+
+        from .async_client import AsyncClient
+
+        return AsyncClient
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,535 @@
+import itertools
+import math
+from typing import AsyncIterator, Callable, Iterable, Union
+
+from ..cache import ResponseCache
+from ..exceptions import LoginException, SessionException
+from ..history import HistoryStore
+from ..scheduler import RequestScheduler
+from ..instrumentation import Instrumentation
+from ..executor import ParseExecutor
+from ..catalog import CatalogIndex
+from ..timeseries import PriceStore
+from ..filters import Parser, SellMethod, ListingDuration
+from .async_core import AsyncClientCore
+from .batch import BatchResult, _map_ordered_async, _run_batch_async
+from .matrix import PriceMatrix, _PriceGrid
+from .pagination import PAGE_SIZE, _HistorySync, _iter_pages_async
+from ..product import SIZES_IDS, Product
+
+
+class AsyncClient(AsyncClientCore):
+
+    def __init__(self, proxy: Union[dict, list] = None, pool_size: int = 100, keep_alive: bool = True, cache: ResponseCache = None, parser: Parser = Parser.Soup, scheduler: RequestScheduler = None, timeout: float = 30, instrumentation: Instrumentation = None, parse_executor: ParseExecutor = None, catalog: CatalogIndex = None, price_store: PriceStore = None, memo_size: int = 1024) -> None:
+        """
+        Initializes an asyncio Restocks.net client with the option to log into your personal account.
+
+        The client exposes the same methods as `Client` as coroutines. Close it with `await client.close()`
+        or use it as an async context manager.
+
+        Args:
+            proxy: a single or multiple proxies to use for the requests. Proxies will rotate at each request for methods
+            which do not require a log in. A random static proxy will be used for all the requests after you log in.
+            pool_size: the maximum number of connections open at the same time, in total across all the proxies, since
+            the async client shares one connection pool between them. Defaults to 100.
+            keep_alive: whether connections are reused across requests. Defaults to True.
+            cache: an optional `ResponseCache` for the product search, product page and size lowest price responses.
+            parser: the HTML parser backend. `Parser.Lxml` gives the same results using less CPU. Defaults to `Parser.Soup`.
+            scheduler: an optional `RequestScheduler` rate limiting and retrying the requests.
+            timeout: the timeout in seconds of each request. Defaults to 30.
+            instrumentation: an optional `Instrumentation` receiving the timings of every request and parsing.
+            parse_executor: an optional `ParseExecutor` parsing the pages in worker processes, for large batches of pages.
+            catalog: an optional `CatalogIndex` filled with the products seen, resolving their SKUs without a search request.
+            price_store: an optional `PriceStore` recording the size prices of every product fetched.
+            memo_size: the number of product pages whose validators and parsed sizes are kept, least recently used
+            first out. Set it above the number of products a monitor watches. Defaults to 1024.
+        """
+
+        super().__init__(proxy, pool_size, keep_alive, cache, parser, scheduler, timeout, instrumentation, parse_executor, catalog, price_store, memo_size)
+
+    async def login(self, email: str, password: str):
+        """
+        Logs into your Restocks.net account.
+
+        Args:
+            email: your Restocks.net account email.
+            password: your Restocks.net account password.
+        """
+
+        await self._set_locale_request()
+
+        login_page = await self._login_page_request()
+
+        csrf_token = await self._csrf_token_parsing(login_page)
+
+        if not csrf_token:
+
+            raise LoginException("csrf-token not found")
+
+        res = await self._login_with_token_request(csrf_token, email, password)
+
+        if "loginForm" in res:
+
+            raise LoginException("invalid login credentials")
+
+        main_page = await self._main_page_request()
+
+        session_token = await self._csrf_token_parsing(main_page)
+
+        if not session_token:
+
+            raise LoginException("session token not found")
+
+        self._session_token = session_token
+
+        # payouts may differ between accounts
+        self._sell_profits.clear()
+
+    async def get_sales_history(self, query: str = None, page: int = 1) -> list[Product]:
+        """
+        Gets the account product sales history.
+
+        Args:
+            query: query to base the search on. Defaults to None.
+            page: the page number. One page contains 48 products. Defaults to 1.
+
+        Raises:
+            SessionException: if no sales were found.
+
+        Returns:
+            List containing the history all the account sold products.
+        """
+
+        sales = await self._sales_history_page(query, page)
+
+        if not sales:
+
+            raise SessionException("no sales found")
+
+        return Product._from_json_many(sales)
+
+    async def iter_sales_history(self, query: str = None, prefetch: bool = False) -> AsyncIterator[Product]:
+        """
+        Iterates lazily over all the account product sales history pages.
+
+        Args:
+            query: query to base the search on. Defaults to None.
+            prefetch: whether to download the next page while the current one is consumed. Defaults to False.
+
+        Returns:
+            An async iterator yielding every account sold product, ending after the last page.
+        """
+
+        async for sale in _iter_pages_async(lambda page: self._sales_history_page(query, page), prefetch):
+
+            yield Product._from_json(sale)
+
+    async def _sales_history_page(self, query: str, page: int) -> list[dict]:
+
+        res = await self._sales_history_request(query or "", page)
+
+        src = res["products"]
+
+        if "no__listings__notice" in src:
+
+            return []
+
+        rows = await self._sales_history_parsing(src)
+
+        self._index(rows, ())
+
+        return rows
+
+    async def get_listings_history(self, query: str = None, page: int = 1, sell_method: SellMethod = SellMethod.Resell) -> list[Product]:
+        """
+        Gets the account listings history.
+
+        Args:
+            query: a query to base the search on. Defaults to None.
+            page: the page number. One page contains 48 products. Defaults to 1.
+
+        Raises:
+            SessionException: if no listings were found.
+
+        Returns:
+            A list containing all the account listed products.
+        """
+
+        listings = await self._listings_history_page(query, page, sell_method)
+
+        if not listings:
+
+            raise SessionException("no listings found")
+
+        return Product._from_json_many(listings)
+
+    async def iter_listings_history(self, query: str = None, sell_method: SellMethod = SellMethod.Resell, prefetch: bool = False) -> AsyncIterator[Product]:
+        """
+        Iterates lazily over all the account listings history pages.
+
+        Args:
+            query: a query to base the search on. Defaults to None.
+            prefetch: whether to download the next page while the current one is consumed. Defaults to False.
+
+        Returns:
+            An async iterator yielding every account listed product, ending after the last page.
+        """
+
+        async for listing in _iter_pages_async(lambda page: self._listings_history_page(query, page, sell_method), prefetch):
+
+            yield Product._from_json(listing)
+
+    async def _listings_history_page(self, query: str, page: int, sell_method: SellMethod) -> list[dict]:
+
+        res = await self._listings_history_request(
+            query or "", page, "consignment" if sell_method == SellMethod.Consign else sell_method)
+
+        src = res["products"]
+
+        if "no__listings__notice" in src:
+
+            return []
+
+        rows = await self._listings_history_parsing(src)
+
+        self._index(rows, ("id",))
+
+        return rows
+
+    async def sync_sales_history(self, store: HistoryStore, full: bool = False) -> list[Product]:
+        """
+        Incrementally syncs the account sales history into a local store. Pages are walked from the newest
+        sales and paging stops at the first page without new sales or at the newest sale of the previous sync.
+
+        Args:
+            store: the local `HistoryStore`.
+            full: whether to walk all the pages regardless of the already stored sales. Defaults to False.
+
+        Returns:
+            The sales which were not stored yet or changed since the previous sync.
+        """
+
+        return await self._sync_history(store, "sales", lambda page: self._sales_history_page(None, page),
+                                  lambda row: row["id"], full)
+
+    async def sync_listings_history(self, store: HistoryStore, sell_method: SellMethod = SellMethod.Resell, full: bool = False) -> list[Product]:
+        """
+        Incrementally syncs the account listings history into a local store. Pages are walked from the newest
+        listings and paging stops at the first page without new or changed listings or at the newest listing of the
+        previous sync.
+
+        Args:
+            store: the local `HistoryStore`.
+            sell_method: the listings selling method. Defaults to `SellMethod.Resell`.
+            full: whether to walk all the pages, catching changes on older listings. Defaults to False.
+
+        Returns:
+            The listings which were not stored yet or changed since the previous sync.
+        """
+
+        return await self._sync_history(store, f"listings:{sell_method}",
+                                  lambda page: self._listings_history_page(None, page, sell_method),
+                                  lambda row: row["listing_id"], full)
+
+    async def _sync_history(self, store: HistoryStore, kind: str, fetch: Callable, key: Callable[[dict], str], full: bool) -> list[Product]:
+
+        sync = _HistorySync(store, kind, key, full)
+
+        # a failing page raises before anything is stored, the next sync finds its rows again
+        for page in itertools.count(1):
+
+            if not sync.add(await fetch(page)):
+
+                break
+
+        return sync.commit()
+
+    async def search_products(self, query: str, page: int = 1) -> list[Product]:
+        """
+        Searches for products based on a provided query.
+
+        Args:
+            query: query to base the search on.
+            page: the page number. One page contains 48 products. Defaults to 1.
+
+
+        Returns:
+            List containing the found products and his data.
+        """
+
+        res = await self._search_product_request(query, page)
+
+        if not res["data"]:
+
+            page = math.ceil(res["total"] / PAGE_SIZE)
+
+            res = await self._search_product_request(query, page)
+
+        return Product._from_json_many(res["data"])
+
+    async def iter_search(self, query: str, max_concurrency: int = 8) -> AsyncIterator[Product]:
+        """
+        Iterates over all the products found for a query. The first page gives the total number of results,
+        then the remaining pages are fetched concurrently.
+
+        Args:
+            query: query to base the search on.
+            max_concurrency: the maximum number of pages fetched at the same time. Defaults to 8.
+
+        Returns:
+            An async iterator yielding every found product in page order.
+        """
+
+        res = await self._search_product_request(query, 1)
+
+        for product in Product._from_json_many(res["data"]):
+
+            yield product
+
+        pages = math.ceil(res["total"] / PAGE_SIZE)
+
+        async for res in _map_ordered_async(lambda page: self._search_product_request(query, page), range(2, pages + 1), max_concurrency):
+
+            for product in Product._from_json_many(res["data"]):
+
+                yield product
+
+    async def get_product(self, sku_or_query: str) -> Product:
+        """
+        Gets the full data of a product.
+
+        Args:
+            sku_or_query: either the SKU code of the sneaker or a name to base the search on. The SKUs known to
+            the client catalog skip the search, the product price then being the one of the last search seen.
+
+        Returns:
+            The product data
+        """
+
+        product = self._catalog_row(sku_or_query)
+
+        if product is None:
+
+            res = await self._search_product_request(sku_or_query, 1)
+
+            # copied since the search response may be held by the response cache
+            product = dict(res["data"][0])
+
+        p = Product._from_json(product)
+
+        src = await self._product_request(p.slug)
+
+        variants = await self._product_parsing(src)
+
+        self._record_prices(p.sku, variants)
+
+        product["variants"] = variants
+
+        return Product._from_json(product)
+
+    def get_products(self, skus: Iterable[str], max_concurrency: int = 32) -> AsyncIterator[BatchResult]:
+        """
+        Gets the full data of multiple products concurrently. Proxies rotate at each request.
+
+        Args:
+            skus: the SKU codes or names of the products.
+            max_concurrency: the maximum number of products fetched at the same time. Defaults to 32.
+
+        Returns:
+            An async iterator yielding a `BatchResult` per SKU as soon as it completes. Its `value` holds the
+            `Product` and its `error` holds the exception raised while fetching it, if any.
+        """
+
+        return _run_batch_async(self.get_product, skus, max_concurrency)
+
+    async def get_size_lowest_price(self, product_id: int, size: str) -> int:
+        """
+        Gets the lowest price for a product size.
+
+        Args:
+            product_id: the product id.
+            size: the product size.
+
+        Returns:
+            The size lowest price.
+        """
+
+        size_id = SIZES_IDS.get(size)
+
+        if not size_id:
+
+            raise SessionException("invalid size")
+
+        res = await self._size_lowest_price_request(product_id, size_id)
+
+        return int(res)
+
+    async def get_lowest_price_matrix(self, products: Iterable[Union[Product, int]], sizes: Iterable[str] = None, max_concurrency: int = 32) -> PriceMatrix:
+        """
+        Gets the lowest price of many sizes of many products. The prices are read from the product variants when
+        known, else from a single product page request per product, and only the sizes missing from it are
+        requested one by one, concurrently.
+
+        Args:
+            products: either the `Product` objects or the product ids. Bare ids can only be priced one size at a time.
+            sizes: the product sizes. Defaults to all the sizes.
+            max_concurrency: the maximum number of requests made at the same time. Defaults to 32.
+
+        Returns:
+            A `PriceMatrix` with the sizes lowest prices keyed by product id and size, None where the size is out of
+            stock or its price could not be fetched, and the errors of the latter.
+        """
+
+        grid = _PriceGrid(products, sizes)
+
+        async def variants(i: int) -> dict:
+
+            product = grid.products[i]
+
+            if product.variants is not None:
+
+                return {v.size: v.price for v in product.variants}
+
+            return await self._product_parsing(await self._product_request(product.slug))
+
+        missing = grid.add_pages([r async for r in _run_batch_async(variants, grid.pages, max_concurrency)])
+
+        async for r in _run_batch_async(lambda key: self.get_size_lowest_price(*key), missing, max_concurrency):
+
+            grid.add(r)
+
+        return grid.result()
+
+    async def list_product(self, product: Union[Product, str], store_price: int, size: str, sell_method: SellMethod, duration: ListingDuration) -> bool:
+        """
+        Lists a product for sale.
+
+        Args:
+            product: either the `Product` object or the product sku.
+            store_price: the price for the listing.
+            size: the product size you are willing to sell.
+            sell_method: the selling method.
+            duration: the listing duration.
+
+        Returns:
+            A boolean that indicates if the product was listed successfuly.
+        """
+
+        if not isinstance(product, Product):
+
+            product = await self._listing_product(product)
+
+        return await self._create_listing(product, store_price, size, sell_method, duration)
+
+    async def list_products(self, listings: Iterable[dict], validate: bool = True, max_concurrency: int = 32) -> list[BatchResult]:
+        """
+        Lists many products for sale at once. The products given by SKU are resolved concurrently once per SKU,
+        from the catalog or a single search request, and the payout is requested once per price and selling method.
+
+        Args:
+            listings: the listings, each one a dict with the `list_product` arguments (`product`, `store_price`,
+            `size`, `sell_method` and `duration`).
+            validate: whether to validate each listing before creating it, a listing the validation rejects is not
+            created and its error holds the rejection message. Defaults to True.
+            max_concurrency: the maximum number of requests made at the same time. Defaults to 32.
+
+        Returns:
+            A `BatchResult` per listing, in the given order, keyed by the listing index. Its `value` indicates if the
+            product was listed successfuly and its `error` holds the exception raised while listing it, if any.
+        """
+
+        listings = list(listings)
+
+        skus = {l["product"] for l in listings if not isinstance(l["product"], Product)}
+
+        products = {r.key: r async for r in _run_batch_async(self._listing_product, skus, max_concurrency)}
+
+        # fills the payout memo, failed lookups are retried and reported by their listings
+        async for _ in _run_batch_async(lambda key: self._get_sell_profit(*key), {(l["store_price"], l["sell_method"]) for l in listings}, max_concurrency):
+
+            pass
+
+        async def create(i: int) -> bool:
+
+            listing = listings[i]
+
+            product = listing["product"]
+
+            if not isinstance(product, Product):
+
+                if not products[product].ok:
+
+                    raise products[product].error
+
+                product = products[product].value
+
+            return await self._create_listing(product, listing["store_price"], listing["size"], listing["sell_method"], listing["duration"], validate)
+
+        return sorted([r async for r in _run_batch_async(create, range(len(listings)), max_concurrency)], key=lambda r: r.key)
+
+    async def _listing_product(self, sku: str) -> Product:
+
+        # listing only needs the product id, which the catalog or the first search row hold without the product page
+        row = self._catalog_row(sku) or (await self._search_product_request(sku, 1))["data"][0]
+
+        return Product._from_json(row)
+
+    async def _create_listing(self, product: Product, store_price: int, size: str, sell_method: SellMethod, duration: ListingDuration, validate: bool = False) -> bool:
+
+        price = await self._get_sell_profit(store_price, sell_method)
+
+        size_id = SIZES_IDS.get(size)
+
+        if not size_id:
+
+            raise SessionException("invalid size")
+
+        if validate:
+
+            res = await self._validate_listing_request(product.id, size_id, store_price, price, sell_method, duration)
+
+            if not res.get("success"):
+
+                raise SessionException(res.get("message") or "invalid listing data")
+
+        res = await self._create_listing_request(
+            product_id=product.id,
+            sell_method=sell_method,
+            size_id=size_id,
+            store_price=store_price,
+            price=price,
+            duration=duration
+        )
+
+        return "success" in res["redirectUrl"]
+
+    async def edit_listing(self, listing_id: int, new_price: int) -> bool:
+        """
+        Edit the price of a current listing.
+
+        Args:
+            listing_id: the listing id.
+            new_price: the new price.
+
+        Returns:
+            A boolean that indicates if the listing was edited successfuly.
+        """
+
+        res = await self._edit_listing_request(listing_id, new_price)
+
+        return res.get("success", False)
+
+    async def delete_listing(self, listing_id: int) -> bool:
+        """
+        Delete a current listed product.
+
+        Args:
+            listing_id: the listing id.
+
+        Returns:
+            A boolean that indicates if the listing was deleted successfuly.
+        """
+
+        res = await self._delete_listing_request(listing_id)
+
+        return res.get("success", False)
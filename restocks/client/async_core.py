@@ -0,0 +1,259 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Mapping, Optional, Union
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .core import ClientCore, _size_list_digest
+from ..cache import ResponseCache
+from ..filters import Parser
+from ..scheduler import RequestScheduler
+from ..instrumentation import Instrumentation
+from ..executor import ParseExecutor
+from ..catalog import CatalogIndex
+from ..timeseries import PriceStore
+from ..utils.request import _proxy_key
+
+
+class _AsyncResponse:
+
+    """
+    Buffered aiohttp response exposing the subset of the `requests.Response` interface used by the core handlers.
+    """
+
+    def __init__(self, status_code: int, url: str, headers: Mapping[str, str], text: str) -> None:
+
+        self.status_code = status_code
+        self.url = url
+        self.headers = headers
+        self.text = text
+
+    def json(self) -> Any:
+
+        return json.loads(self.text)
+
+
+def _aiohttp_proxy(proxy: Optional[dict]) -> Optional[str]:
+
+    return (proxy.get("https") or proxy.get("http")) if proxy else None
+
+
+def _aiohttp_params(params: Optional[dict]) -> Optional[dict]:
+
+    return {k: str(v) for k, v in params.items() if v is not None} if params else None
+
+
+def _trace_config() -> "aiohttp.TraceConfig":
+
+    # records the phases end times in the timings dict given as trace_request_ctx
+    def mark(name: str) -> Callable:
+
+        async def on_event(session, ctx, params) -> None:
+
+            if ctx.trace_request_ctx is not None:
+
+                ctx.trace_request_ctx[name] = time.monotonic()
+
+        return on_event
+
+    trace_config = aiohttp.TraceConfig()
+
+    trace_config.on_dns_resolvehost_start.append(mark("dns_start"))
+    trace_config.on_dns_resolvehost_end.append(mark("dns_end"))
+    trace_config.on_connection_create_start.append(mark("connect_start"))
+    trace_config.on_connection_create_end.append(mark("connect_end"))
+    trace_config.on_request_end.append(mark("headers"))
+
+    return trace_config
+
+
+def _elapsed(timings: dict, start: float) -> dict:
+
+    def span(begin: str, end: str) -> Optional[float]:
+
+        return timings[end] - timings[begin] if begin in timings and end in timings else None
+
+    return {
+        "dns": span("dns_start", "dns_end"),
+        "connect": span("connect_start", "connect_end"),
+        "ttfb": timings["headers"] - start if "headers" in timings else None,
+    }
+
+
+class AsyncClientCore(ClientCore):
+
+    def __init__(self, proxy: Union[dict, list] = None, pool_size: int = 100, keep_alive: bool = True, cache: ResponseCache = None, parser: Parser = Parser.Soup, scheduler: RequestScheduler = None, timeout: float = 30, instrumentation: Instrumentation = None, parse_executor: ParseExecutor = None, catalog: CatalogIndex = None, price_store: PriceStore = None, memo_size: int = 1024) -> None:
+
+        if aiohttp is None:
+
+            raise ImportError("aiohttp is required for the async client, install it with `pip install restocks-client[async]`")
+
+        super().__init__(proxy, pool_size, keep_alive, cache, parser, scheduler, timeout, instrumentation, parse_executor, catalog, price_store, memo_size)
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+
+        # aiohttp sessions must be created inside a running event loop
+
+        if self._session is None or self._session.closed:
+
+            # one pool serves every proxy, so the pool size caps the connections in total rather than per proxy
+            connector = aiohttp.TCPConnector(limit=self._proxy_pool.pool_size, force_close=not self._proxy_pool.keep_alive)
+
+            trace_configs = [_trace_config()] if self._instrumentation is not None else None
+
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self._timeout), trace_configs=trace_configs)
+
+        return self._session
+
+    async def close(self) -> None:
+
+        if self._session is not None and not self._session.closed:
+
+            await self._session.close()
+
+    async def __aenter__(self):
+
+        return self
+
+    async def __aexit__(self, *args) -> None:
+
+        await self.close()
+
+    async def _send(self, endpoint: str, method: str, url: str, handler: Callable[[_AsyncResponse], Any], headers: dict = None, params: dict = None, session: bool = True) -> Any:
+
+        client = self._get_session()
+
+        attempt = 0
+
+        while True:
+
+            proxy = self._proxy_pool.get_proxy(sticky="session" if session else None)
+
+            if self._scheduler is not None:
+
+                await asyncio.sleep(self._scheduler.acquire(endpoint, _proxy_key(proxy)))
+
+            start = time.monotonic()
+
+            timings = {}
+
+            try:
+
+                async with client.request(method, url, headers=headers, params=_aiohttp_params(params), proxy=_aiohttp_proxy(proxy), trace_request_ctx=timings) as res:
+
+                    body = await res.read()
+
+                    response = _AsyncResponse(res.status, str(res.url), res.headers.copy(), await res.text())
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+
+                self._proxy_pool.report(proxy, time.monotonic() - start, None)
+
+                self._request_event(endpoint, method, url, proxy, attempt, start, error=e, **_elapsed(timings, start))
+
+                if self._scheduler is None or (delay := self._scheduler.report(endpoint, _proxy_key(proxy), method, attempt, None)) is None:
+
+                    raise
+
+            else:
+
+                self._proxy_pool.report(proxy, time.monotonic() - start, response.status_code)
+
+                self._request_event(endpoint, method, url, proxy, attempt, start, response.status_code, len(body), **_elapsed(timings, start))
+
+                if session:
+
+                    self._check_session(url, response)
+
+                if self._scheduler is None or (delay := self._scheduler.report(
+                        endpoint, _proxy_key(proxy), method, attempt, response.status_code, response.headers.get("Retry-After"))) is None:
+
+                    return handler(response)
+
+            await asyncio.sleep(delay)
+
+            attempt += 1
+
+    async def _cached(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+
+        if self._cache is not None:
+
+            value = self._cache.get(endpoint, key)
+
+            if value is not None:
+
+                return value
+
+        async def fetch_and_store() -> Any:
+
+            value = await fetch()
+
+            if self._cache is not None:
+
+                self._cache.set(endpoint, key, value)
+
+            return value
+
+        return await self._coalesce((endpoint, key), fetch_and_store)
+
+    async def _coalesce(self, key: tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+
+        task = self._inflight.get(key)
+
+        if task is None:
+
+            # the request runs as its own task, so a cancelled caller does not cancel it for the others
+            task = self._inflight[key] = asyncio.ensure_future(fetch())
+
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    async def _parse(self, name: str, parse: Callable[[str], Any], src: str) -> Any:
+
+        start = time.perf_counter()
+
+        if self._parse_executor is None:
+
+            result = parse(src)
+
+        else:
+
+            # the event loop keeps running the other requests while a worker process parses
+            result = await asyncio.wrap_future(self._parse_executor.submit(parse, src))
+
+        self._parse_event(name, src, start)
+
+        return result
+
+    async def _product_parsing(self, src: str) -> dict:
+
+        fragment, digest = _size_list_digest(src)
+
+        sizes = self._parsed.get(digest)
+
+        if sizes is None:
+
+            sizes = await self._parse("product", self._parser.product, fragment)
+
+            self._parsed.set(digest, sizes)
+
+        return sizes
+
+    async def _get_sell_profit(self, store_price: int, sell_method: str) -> float:
+
+        key = (store_price, str(sell_method))
+
+        profit = self._sell_profits.get(key)
+
+        if profit is None:
+
+            res = await self._sell_profit_request(store_price, sell_method)
+
+            profit = self._sell_profits[key] = res["payout"]["decimal"]
+
+        return profit
@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, NamedTuple, Optional
+
+
+class BatchResult(NamedTuple):
+
+    key: Any
+    value: Any
+    error: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+
+        return self.error is None
+
+
+def _run_batch(fn: Callable[[Any], Any], keys: Iterable, max_workers: int) -> Iterator[BatchResult]:
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    try:
+
+        futures = {executor.submit(fn, key): key for key in keys}
+
+        for future in as_completed(futures):
+
+            key = futures[future]
+
+            try:
+
+                yield BatchResult(key, future.result(), None)
+
+            except Exception as e:
+
+                yield BatchResult(key, None, e)
+
+    finally:
+
+        # the consumer may stop iterating early, pending calls are dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_batch_async(fn: Callable[[Any], Awaitable[Any]], keys: Iterable, max_concurrency: int) -> AsyncIterator[BatchResult]:
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(key: Any) -> BatchResult:
+
+        async with semaphore:
+
+            try:
+
+                return BatchResult(key, await fn(key), None)
+
+            except Exception as e:
+
+                return BatchResult(key, None, e)
+
+    tasks = [asyncio.ensure_future(run(key)) for key in keys]
+
+    try:
+
+        for task in asyncio.as_completed(tasks):
+
+            yield await task
+
+    finally:
+
+        for task in tasks:
+
+            task.cancel()
+
+
+def _map_ordered(fn: Callable[[Any], Any], keys: Iterable, max_workers: int) -> Iterator[Any]:
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    try:
+
+        futures = [executor.submit(fn, key) for key in keys]
+
+        for future in futures:
+
+            yield future.result()
+
+    finally:
+
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _map_ordered_async(fn: Callable[[Any], Awaitable[Any]], keys: Iterable, max_concurrency: int) -> AsyncIterator[Any]:
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(key: Any) -> Any:
+
+        async with semaphore:
+
+            return await fn(key)
+
+    tasks = [asyncio.ensure_future(run(key)) for key in keys]
+
+    try:
+
+        for task in tasks:
+
+            yield await task
+
+    finally:
+
+        for task in tasks:
+
+            task.cancel()
@@ -1,24 +1,47 @@
+import itertools
 import math
-from typing import Union
+from typing import Callable, Iterable, Iterator, Union
 
+from ..cache import ResponseCache
 from ..exceptions import LoginException, SessionException
-from ..filters import SellMethod, ListingDuration
+from ..history import HistoryStore
+from ..scheduler import RequestScheduler
+from ..instrumentation import Instrumentation
+from ..executor import ParseExecutor
+from ..catalog import CatalogIndex
+from ..timeseries import PriceStore
+from ..filters import Parser, SellMethod, ListingDuration
 from .core import ClientCore
+from .batch import BatchResult, _map_ordered, _run_batch
+from .matrix import PriceMatrix, _PriceGrid
+from .pagination import PAGE_SIZE, _HistorySync, _iter_pages
 from ..product import SIZES_IDS, Product
 
 
 class Client(ClientCore):
 
-    def __init__(self, proxy: Union[dict, list] = None) -> None:
+    def __init__(self, proxy: Union[dict, list] = None, pool_size: int = 16, keep_alive: bool = True, cache: ResponseCache = None, parser: Parser = Parser.Soup, scheduler: RequestScheduler = None, timeout: float = 30, instrumentation: Instrumentation = None, parse_executor: ParseExecutor = None, catalog: CatalogIndex = None, price_store: PriceStore = None, memo_size: int = 1024) -> None:
         """
         Initializes a Restocks.net client with the option to log into your personal account.
 
         Args:
             proxy: a single or multiple proxies to use for the requests. Proxies will rotate at each request for methods 
             which do not require a log in. A random static proxy will be used for all the requests after you log in.
+            pool_size: the maximum number of connections kept open per proxy. Defaults to 16.
+            keep_alive: whether connections are reused across requests. Defaults to True.
+            cache: an optional `ResponseCache` for the product search, product page and size lowest price responses.
+            parser: the HTML parser backend. `Parser.Lxml` gives the same results using less CPU. Defaults to `Parser.Soup`.
+            scheduler: an optional `RequestScheduler` rate limiting and retrying the requests.
+            timeout: the timeout in seconds of each request. Defaults to 30.
+            instrumentation: an optional `Instrumentation` receiving the timings of every request and parsing.
+            parse_executor: an optional `ParseExecutor` parsing the pages in worker processes, for large batches of pages.
+            catalog: an optional `CatalogIndex` filled with the products seen, resolving their SKUs without a search request.
+            price_store: an optional `PriceStore` recording the size prices of every product fetched.
+            memo_size: the number of product pages whose validators and parsed sizes are kept, least recently used
+            first out. Set it above the number of products a monitor watches. Defaults to 1024.
         """
 
-        super().__init__(proxy)
+        super().__init__(proxy, pool_size, keep_alive, cache, parser, scheduler, timeout, instrumentation, parse_executor, catalog, price_store, memo_size)
 
     def login(self, email: str, password: str):
         """
@@ -49,12 +72,15 @@ class Client(ClientCore):
 
         session_token = self._csrf_token_parsing(main_page)
 
-        if not csrf_token:
+        if not session_token:
 
             raise LoginException("session token not found")
 
         self._session_token = session_token
 
+        # payouts may differ between accounts
+        self._sell_profits.clear()
+
     def get_sales_history(self, query: str = None, page: int = 1) -> list[Product]:
         """
         Gets the account product sales history.
@@ -70,17 +96,45 @@ class Client(ClientCore):
             List containing the history all the account sold products.
         """
 
+        sales = self._sales_history_page(query, page)
+
+        if not sales:
+
+            raise SessionException("no sales found")
+
+        return Product._from_json_many(sales)
+
+    def iter_sales_history(self, query: str = None, prefetch: bool = False) -> Iterator[Product]:
+        """
+        Iterates lazily over all the account product sales history pages.
+
+        Args:
+            query: query to base the search on. Defaults to None.
+            prefetch: whether to download the next page while the current one is consumed. Defaults to False.
+
+        Returns:
+            An iterator yielding every account sold product, ending after the last page.
+        """
+
+        for sale in _iter_pages(lambda page: self._sales_history_page(query, page), prefetch):
+
+            yield Product._from_json(sale)
+
+    def _sales_history_page(self, query: str, page: int) -> list[dict]:
+
         res = self._sales_history_request(query or "", page)
 
         src = res["products"]
 
         if "no__listings__notice" in src:
 
-            raise SessionException("no sales found")
+            return []
 
-        sales = self._sales_history_parsing(src)
+        rows = self._sales_history_parsing(src)
 
-        return [Product._from_json(s) for s in sales]
+        self._index(rows, ())
+
+        return rows
 
     def get_listings_history(self, query: str = None, page: int = 1, sell_method: SellMethod = SellMethod.Resell) -> list[Product]:
         """
@@ -97,6 +151,32 @@ class Client(ClientCore):
             A list containing all the account listed products.
         """
 
+        listings = self._listings_history_page(query, page, sell_method)
+
+        if not listings:
+
+            raise SessionException("no listings found")
+
+        return Product._from_json_many(listings)
+
+    def iter_listings_history(self, query: str = None, sell_method: SellMethod = SellMethod.Resell, prefetch: bool = False) -> Iterator[Product]:
+        """
+        Iterates lazily over all the account listings history pages.
+
+        Args:
+            query: a query to base the search on. Defaults to None.
+            prefetch: whether to download the next page while the current one is consumed. Defaults to False.
+
+        Returns:
+            An iterator yielding every account listed product, ending after the last page.
+        """
+
+        for listing in _iter_pages(lambda page: self._listings_history_page(query, page, sell_method), prefetch):
+
+            yield Product._from_json(listing)
+
+    def _listings_history_page(self, query: str, page: int, sell_method: SellMethod) -> list[dict]:
+
         res = self._listings_history_request(
             query or "", page, "consignment" if sell_method == SellMethod.Consign else sell_method)
 
@@ -104,11 +184,61 @@ class Client(ClientCore):
 
         if "no__listings__notice" in src:
 
-            raise SessionException("no listings found")
+            return []
+
+        rows = self._listings_history_parsing(src)
 
-        listings = self._listings_history_parsing(src)
+        self._index(rows, ("id",))
 
-        return [Product._from_json(l) for l in listings]
+        return rows
+
+    def sync_sales_history(self, store: HistoryStore, full: bool = False) -> list[Product]:
+        """
+        Incrementally syncs the account sales history into a local store. Pages are walked from the newest
+        sales and paging stops at the first page without new sales or at the newest sale of the previous sync.
+
+        Args:
+            store: the local `HistoryStore`.
+            full: whether to walk all the pages regardless of the already stored sales. Defaults to False.
+
+        Returns:
+            The sales which were not stored yet or changed since the previous sync.
+        """
+
+        return self._sync_history(store, "sales", lambda page: self._sales_history_page(None, page),
+                                  lambda row: row["id"], full)
+
+    def sync_listings_history(self, store: HistoryStore, sell_method: SellMethod = SellMethod.Resell, full: bool = False) -> list[Product]:
+        """
+        Incrementally syncs the account listings history into a local store. Pages are walked from the newest
+        listings and paging stops at the first page without new or changed listings or at the newest listing of the
+        previous sync.
+
+        Args:
+            store: the local `HistoryStore`.
+            sell_method: the listings selling method. Defaults to `SellMethod.Resell`.
+            full: whether to walk all the pages, catching changes on older listings. Defaults to False.
+
+        Returns:
+            The listings which were not stored yet or changed since the previous sync.
+        """
+
+        return self._sync_history(store, f"listings:{sell_method}",
+                                  lambda page: self._listings_history_page(None, page, sell_method),
+                                  lambda row: row["listing_id"], full)
+
+    def _sync_history(self, store: HistoryStore, kind: str, fetch: Callable, key: Callable[[dict], str], full: bool) -> list[Product]:
+
+        sync = _HistorySync(store, kind, key, full)
+
+        # a failing page raises before anything is stored, the next sync finds its rows again
+        for page in itertools.count(1):
+
+            if not sync.add(fetch(page)):
+
+                break
+
+        return sync.commit()
 
     def search_products(self, query: str, page: int = 1) -> list[Product]:
         """
@@ -127,26 +257,55 @@ class Client(ClientCore):
 
         if not res["data"]:
 
-            page = math.ceil(res["total"] / 48)
+            page = math.ceil(res["total"] / PAGE_SIZE)
 
             res = self._search_product_request(query, page)
 
-        return [Product._from_json(p) for p in res["data"]]
+        return Product._from_json_many(res["data"])
+
+    def iter_search(self, query: str, max_workers: int = 8) -> Iterator[Product]:
+        """
+        Iterates over all the products found for a query. The first page gives the total number of results,
+        then the remaining pages are fetched concurrently.
+
+        Args:
+            query: query to base the search on.
+            max_workers: the maximum number of pages fetched at the same time. Defaults to 8.
+
+        Returns:
+            An iterator yielding every found product in page order.
+        """
+
+        res = self._search_product_request(query, 1)
+
+        yield from Product._from_json_many(res["data"])
+
+        pages = math.ceil(res["total"] / PAGE_SIZE)
+
+        for res in _map_ordered(lambda page: self._search_product_request(query, page), range(2, pages + 1), max_workers):
+
+            yield from Product._from_json_many(res["data"])
 
     def get_product(self, sku_or_query: str) -> Product:
         """
         Gets the full data of a product.
 
         Args:
-            sku_or_query: either the SKU code of the sneaker or a name to base the search on.
+            sku_or_query: either the SKU code of the sneaker or a name to base the search on. The SKUs known to
+            the client catalog skip the search, the product price then being the one of the last search seen.
 
         Returns:
             The product data
         """
 
-        res = self._search_product_request(sku_or_query, 1)
+        product = self._catalog_row(sku_or_query)
+
+        if product is None:
+
+            res = self._search_product_request(sku_or_query, 1)
 
-        product = res["data"][0]
+            # copied since the search response may be held by the response cache
+            product = dict(res["data"][0])
 
         p = Product._from_json(product)
 
@@ -154,9 +313,26 @@ class Client(ClientCore):
 
         variants = self._product_parsing(src)
 
+        self._record_prices(p.sku, variants)
+
         product["variants"] = variants
 
-        return Product._from_json(res["data"][0])
+        return Product._from_json(product)
+
+    def get_products(self, skus: Iterable[str], max_workers: int = 8) -> Iterator[BatchResult]:
+        """
+        Gets the full data of multiple products concurrently. Proxies rotate at each request.
+
+        Args:
+            skus: the SKU codes or names of the products.
+            max_workers: the maximum number of products fetched at the same time. Defaults to 8.
+
+        Returns:
+            An iterator yielding a `BatchResult` per SKU as soon as it completes. Its `value` holds the
+            `Product` and its `error` holds the exception raised while fetching it, if any.
+        """
+
+        return _run_batch(self.get_product, skus, max_workers)
 
     def get_size_lowest_price(self, product_id: int, size: str) -> int:
         """
@@ -172,7 +348,7 @@ class Client(ClientCore):
 
         size_id = SIZES_IDS.get(size)
 
-        if not size:
+        if not size_id:
 
             raise SessionException("invalid size")
 
@@ -180,6 +356,42 @@ class Client(ClientCore):
 
         return int(res)
 
+    def get_lowest_price_matrix(self, products: Iterable[Union[Product, int]], sizes: Iterable[str] = None, max_workers: int = 8) -> PriceMatrix:
+        """
+        Gets the lowest price of many sizes of many products. The prices are read from the product variants when
+        known, else from a single product page request per product, and only the sizes missing from it are
+        requested one by one, concurrently.
+
+        Args:
+            products: either the `Product` objects or the product ids. Bare ids can only be priced one size at a time.
+            sizes: the product sizes. Defaults to all the sizes.
+            max_workers: the maximum number of requests made at the same time. Defaults to 8.
+
+        Returns:
+            A `PriceMatrix` with the sizes lowest prices keyed by product id and size, None where the size is out of
+            stock or its price could not be fetched, and the errors of the latter.
+        """
+
+        grid = _PriceGrid(products, sizes)
+
+        def variants(i: int) -> dict:
+
+            product = grid.products[i]
+
+            if product.variants is not None:
+
+                return {v.size: v.price for v in product.variants}
+
+            return self._product_parsing(self._product_request(product.slug))
+
+        missing = grid.add_pages(_run_batch(variants, grid.pages, max_workers))
+
+        for r in _run_batch(lambda key: self.get_size_lowest_price(*key), missing, max_workers):
+
+            grid.add(r)
+
+        return grid.result()
+
     def list_product(self, product: Union[Product, str], store_price: int, size: str, sell_method: SellMethod, duration: ListingDuration) -> bool:
         """
         Lists a product for sale.
@@ -197,16 +409,81 @@ class Client(ClientCore):
 
         if not isinstance(product, Product):
 
-            product = self.get_product(product)
+            product = self._listing_product(product)
+
+        return self._create_listing(product, store_price, size, sell_method, duration)
+
+    def list_products(self, listings: Iterable[dict], validate: bool = True, max_workers: int = 8) -> list[BatchResult]:
+        """
+        Lists many products for sale at once. The products given by SKU are resolved concurrently once per SKU,
+        from the catalog or a single search request, and the payout is requested once per price and selling method.
+
+        Args:
+            listings: the listings, each one a dict with the `list_product` arguments (`product`, `store_price`,
+            `size`, `sell_method` and `duration`).
+            validate: whether to validate each listing before creating it, a listing the validation rejects is not
+            created and its error holds the rejection message. Defaults to True.
+            max_workers: the maximum number of requests made at the same time. Defaults to 8.
+
+        Returns:
+            A `BatchResult` per listing, in the given order, keyed by the listing index. Its `value` indicates if the
+            product was listed successfuly and its `error` holds the exception raised while listing it, if any.
+        """
+
+        listings = list(listings)
+
+        skus = {l["product"] for l in listings if not isinstance(l["product"], Product)}
+
+        products = {r.key: r for r in _run_batch(self._listing_product, skus, max_workers)}
+
+        # fills the payout memo, failed lookups are retried and reported by their listings
+        for _ in _run_batch(lambda key: self._get_sell_profit(*key), {(l["store_price"], l["sell_method"]) for l in listings}, max_workers):
+
+            pass
+
+        def create(i: int) -> bool:
+
+            listing = listings[i]
+
+            product = listing["product"]
+
+            if not isinstance(product, Product):
+
+                if not products[product].ok:
+
+                    raise products[product].error
+
+                product = products[product].value
+
+            return self._create_listing(product, listing["store_price"], listing["size"], listing["sell_method"], listing["duration"], validate)
+
+        return sorted(_run_batch(create, range(len(listings)), max_workers), key=lambda r: r.key)
+
+    def _listing_product(self, sku: str) -> Product:
+
+        # listing only needs the product id, which the catalog or the first search row hold without the product page
+        row = self._catalog_row(sku) or self._search_product_request(sku, 1)["data"][0]
+
+        return Product._from_json(row)
+
+    def _create_listing(self, product: Product, store_price: int, size: str, sell_method: SellMethod, duration: ListingDuration, validate: bool = False) -> bool:
 
         price = self._get_sell_profit(store_price, sell_method)
 
         size_id = SIZES_IDS.get(size)
 
-        if not size:
+        if not size_id:
 
             raise SessionException("invalid size")
 
+        if validate:
+
+            res = self._validate_listing_request(product.id, size_id, store_price, price, sell_method, duration)
+
+            if not res.get("success"):
+
+                raise SessionException(res.get("message") or "invalid listing data")
+
         res = self._create_listing_request(
             product_id=product.id,
             sell_method=sell_method,
@@ -1,10 +1,72 @@
-import re
-from typing import Union
-import requests
-from bs4 import BeautifulSoup
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+from urllib.parse import urlparse
 
-from ..utils.helpers import parse_int, parse_size
-from ..utils.request import validate_response, _ProxyPool
+from ..exceptions import SessionExpiredException
+from ..utils.request import validate_response, _ProxyPool, _proxy_key
+from ..cache import ResponseCache
+from ..filters import Parser
+from ..scheduler import RequestScheduler
+from ..instrumentation import Instrumentation, ParseEvent, RequestEvent
+from ..executor import ParseExecutor
+from ..catalog import CatalogIndex
+from ..timeseries import PriceStore
+from .parsers import _PARSERS, _size_list_fragment
+
+if TYPE_CHECKING:
+    from requests import Response
+    import requests
+
+class _Memo:
+
+    """
+    Least recently used memo of the product page validators or parsed size lists of a client, shared by its threads.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+
+        self.maxsize = maxsize
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+
+        return len(self._data)
+
+    def get(self, key: Any) -> Optional[Any]:
+
+        with self._lock:
+
+            value = self._data.get(key)
+
+            if value is not None:
+
+                self._data.move_to_end(key)
+
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+
+        with self._lock:
+
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+
+                self._data.popitem(last=False)
+
+
+def _size_list_digest(src: str) -> tuple[str, bytes]:
+
+    fragment = _size_list_fragment(src)
+
+    return fragment, hashlib.blake2b(fragment.encode(), digest_size=16).digest()
 
 
 class ClientCore:
@@ -21,31 +83,271 @@ class ClientCore:
         'sec-fetch-dest': 'empty',
     }
 
-    def __init__(self, proxy: Union[dict, list] = None) -> None:
+    def __init__(self, proxy: Union[dict, list] = None, pool_size: int = 16, keep_alive: bool = True, cache: ResponseCache = None, parser: Parser = Parser.Soup, scheduler: RequestScheduler = None, timeout: float = 30, instrumentation: Instrumentation = None, parse_executor: ParseExecutor = None, catalog: CatalogIndex = None, price_store: PriceStore = None, memo_size: int = 1024) -> None:
+
+        self._proxy_pool = _ProxyPool(proxy=proxy, pool_size=pool_size, keep_alive=keep_alive)
 
-        self._session = requests.Session()
+        # created by the first logged in request, short lived clients never pay for it
+        self._session = None
 
-        self._proxy_pool = _ProxyPool(proxy=proxy)
-        self._session.proxies = self._proxy_pool.get_proxy()
+        self._session_lock = threading.Lock()
 
         self._base_url = "https://restocks.net"
 
         self._session_token = None
 
-    @staticmethod
-    def _csrf_token_parsing(src: str) -> Union[str, None]:
+        self._sell_profits = {}
+
+        self._validators = _Memo(memo_size)
+
+        self._parsed = _Memo(memo_size)
+
+        self._inflight = {}
+
+        self._inflight_lock = threading.Lock()
+
+        self._cache = cache
+
+        self._parser = _PARSERS[parser]
+
+        self._scheduler = scheduler
+
+        self._timeout = timeout
+
+        self._instrumentation = instrumentation
+
+        self._parse_executor = parse_executor
+
+        self._catalog = catalog
+
+        self._price_store = price_store
+
+    @property
+    def proxy_stats(self) -> dict:
+        """
+        The requests, errors, 429s, average latency, recent error rate and remaining quarantine time of each proxy.
+        """
+
+        return self._proxy_pool.stats()
+
+    def _get_session(self) -> "requests.Session":
+
+        if self._session is None:
+
+            with self._session_lock:
+
+                if self._session is None:
+
+                    self._session = self._create_session()
+
+        return self._session
+
+    def _create_session(self) -> "requests.Session":
+
+        import requests
+
+        session = requests.Session()
+
+        # each request sends exactly its own headers and proxy, without mutating the shared session
+        session.headers.clear()
+
+        return session
+
+    def _send(self, endpoint: str, method: str, url: str, handler: Callable[["Response"], Any], headers: dict = None, params: dict = None, session: bool = True) -> Any:
+
+        import requests
+
+        attempt = 0
+
+        while True:
+
+            # logged in requests stick to one proxy while it stays healthy, the others draw one at each attempt
+            proxy = self._proxy_pool.get_proxy(sticky="session" if session else None)
+            client = self._get_session() if session else self._proxy_pool.get_session(proxy)
+
+            if self._scheduler is not None:
+
+                time.sleep(self._scheduler.acquire(endpoint, _proxy_key(proxy)))
+
+            start = time.monotonic()
+
+            try:
+
+                res = client.request(method, url, headers=headers, params=params, proxies=proxy, timeout=self._timeout)
+
+            except (requests.ConnectionError, requests.Timeout) as e:
+
+                self._proxy_pool.report(proxy, time.monotonic() - start, None)
+
+                self._request_event(endpoint, method, url, proxy, attempt, start, error=e)
+
+                if self._scheduler is None or (delay := self._scheduler.report(endpoint, _proxy_key(proxy), method, attempt, None)) is None:
+
+                    raise
+
+            else:
+
+                self._proxy_pool.report(proxy, time.monotonic() - start, res.status_code)
+
+                # requests only exposes the time until the response headers were parsed
+                self._request_event(endpoint, method, url, proxy, attempt, start, res.status_code, len(res.content), ttfb=res.elapsed.total_seconds())
+
+                if session:
+
+                    self._check_session(url, res)
+
+                if self._scheduler is None or (delay := self._scheduler.report(
+                        endpoint, _proxy_key(proxy), method, attempt, res.status_code, res.headers.get("Retry-After"))) is None:
+
+                    return handler(res)
+
+            time.sleep(delay)
+
+            attempt += 1
+
+    def _request_event(self, endpoint: str, method: str, url: str, proxy: dict, attempt: int, start: float, status_code: int = None, size: int = 0, error: Exception = None, ttfb: float = None, connect: float = None, dns: float = None) -> None:
+
+        if self._instrumentation is not None:
+
+            self._instrumentation.emit(RequestEvent(endpoint, method, url, _proxy_key(proxy), attempt, status_code, size,
+                                                    time.monotonic() - start, ttfb, connect, dns, error))
+
+    def _parse(self, name: str, parse: Callable[[str], Any], src: str) -> Any:
+
+        start = time.perf_counter()
+
+        if self._parse_executor is None:
+
+            result = parse(src)
+
+        else:
+
+            # the thread waits for the worker without holding the GIL, the other threads keep sending requests
+            result = self._parse_executor.submit(parse, src).result()
+
+        self._parse_event(name, src, start)
+
+        return result
+
+    def _parse_event(self, name: str, src: str, start: float) -> None:
+
+        if self._instrumentation is not None:
+
+            self._instrumentation.emit(ParseEvent(name, len(src), time.perf_counter() - start))
+
+    def _check_session(self, url: str, res: "Response") -> None:
+
+        if not self._session_token:
+
+            return
+
+        redirected_to_login = urlparse(str(res.url)).path.rstrip("/").endswith("/login") and not urlparse(url).path.rstrip("/").endswith("/login")
+
+        if res.status_code in (401, 419) or redirected_to_login:
+
+            raise SessionExpiredException("session expired")
+
+    def _export_session(self) -> dict:
+
+        cookies = [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires, "secure": c.secure}
+                   for c in self._get_session().cookies]
+
+        return {"base_url": self._base_url, "session_token": self._session_token, "cookies": cookies}
+
+    def _import_session(self, state: dict) -> None:
+
+        from requests.cookies import create_cookie
+
+        for cookie in state["cookies"]:
 
-        soup = BeautifulSoup(src, "lxml")
+            self._get_session().cookies.set_cookie(create_cookie(**cookie))
 
-        csrf_token = soup.find("meta", {"name": "csrf-token"})
+        self._base_url = state["base_url"]
+        self._session_token = state["session_token"]
 
-        return csrf_token.get("content") if csrf_token else None
+    def _cached(self, endpoint: str, key: str, fetch: Callable[[], Any]) -> Any:
+
+        if self._cache is not None:
+
+            value = self._cache.get(endpoint, key)
+
+            if value is not None:
+
+                return value
+
+        def fetch_and_store() -> Any:
+
+            value = fetch()
+
+            if self._cache is not None:
+
+                self._cache.set(endpoint, key, value)
+
+            return value
+
+        return self._coalesce((endpoint, key), fetch_and_store)
+
+    def _coalesce(self, key: tuple, fetch: Callable[[], Any]) -> Any:
+
+        # concurrent identical lookups wait for the first one instead of sending their own request
+        with self._inflight_lock:
+
+            future = self._inflight.get(key)
+            leader = future is None
+
+            if leader:
+
+                future = self._inflight[key] = Future()
+
+        if not leader:
+
+            return future.result()
+
+        try:
+
+            value = fetch()
+
+        except BaseException as e:
+
+            future.set_exception(e)
+
+            raise
+
+        else:
+
+            future.set_result(value)
+
+            return value
+
+        finally:
+
+            with self._inflight_lock:
+
+                del self._inflight[key]
+
+    def close(self) -> None:
+
+        if self._session is not None:
+
+            self._session.close()
+
+        self._proxy_pool.close()
+
+    def _set_base_url(self, res: "Response") -> str:
+
+        self._base_url = str(res.url)
+
+        return self._base_url
+
+    def _csrf_token_parsing(self, src: str) -> Union[str, None]:
+
+        return self._parse("csrf_token", self._parser.csrf_token, src)
 
     def _set_locale_request(self):
 
         url = self._base_url
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Not?A_Brand";v="8", "Chromium";v="108", "Google Chrome";v="108"',
             'sec-ch-ua-mobile': '?0',
@@ -58,15 +360,13 @@ class ClientCore:
             'sec-fetch-dest': 'document',
         }
 
-        res = self._session.get(url)
-
-        self._base_url = res.url
+        return self._send("locale", "GET", url, self._set_base_url, headers)
 
     def _main_page_request(self) -> str:
 
         url = self._base_url
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Google Chrome";v="107", "Chromium";v="107", "Not=A?Brand";v="24"',
             'sec-ch-ua-mobile': '?0',
@@ -80,15 +380,13 @@ class ClientCore:
             'referer': self._base_url,
         }
 
-        res = self._session.get(url)
-
-        return validate_response(res, 200).text
+        return self._send("main_page", "GET", url, lambda res: validate_response(res, 200).text, headers)
 
     def _login_page_request(self) -> str:
 
         url = self._base_url + "/login"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'cache-control': 'max-age=0',
             'sec-ch-ua': '"Google Chrome";v="107", "Chromium";v="107", "Not=A?Brand";v="24"',
@@ -103,15 +401,13 @@ class ClientCore:
             'referer': self._base_url,
         }
 
-        res = self._session.get(url)
-
-        return validate_response(res, 200).text
+        return self._send("login_page", "GET", url, lambda res: validate_response(res, 200).text, headers)
 
     def _login_with_token_request(self, token: str, username: str, password: str) -> str:
 
         url = self._base_url + "/login"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'cache-control': 'max-age=0',
             'sec-ch-ua': '"Google Chrome";v="107", "Chromium";v="107", "Not=A?Brand";v="24"',
@@ -134,15 +430,13 @@ class ClientCore:
             "password": password
         }
 
-        res = self._session.post(url, params=params)
-
-        return validate_response(res, 200).text
+        return self._send("login", "POST", url, lambda res: validate_response(res, 200).text, headers, params)
 
     def _sales_history_request(self, query: str, page: int) -> dict:
 
         url = self._base_url + "/account/sales/history"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Not?A_Brand";v="8", "Chromium";v="108", "Google Chrome";v="108"',
             'accept': '*/*',
@@ -159,29 +453,11 @@ class ClientCore:
             'search': query,
         }
 
-        res = self._session.get(url, params=params)
-
-        return validate_response(res, 200).json()
-
-    @staticmethod
-    def _sales_history_parsing(src: str) -> dict:
-
-        soup = BeautifulSoup(src, "lxml")
-
-        sales = soup.find("tbody").find_all("tr") if soup.find(
-            "tbody") else soup.find_all("tr")
+        return self._send("sales_history", "GET", url, lambda res: validate_response(res, 200).json(), headers, params)
 
-        products = []
+    def _sales_history_parsing(self, src: str) -> dict:
 
-        for product in sales:
-
-            img = product.find("img")["src"]
-            name, size, id, price, date = list(product.stripped_strings)
-
-            products.append({"name": name, "size": size, "id": id,
-                            "storeprice": price, "date": date, "image": img})
-
-        return products
+        return self._parse("sales_history", self._parser.sales_history, src)
 
     def _search_product_request(self, query: str, page: int) -> dict:
 
@@ -195,43 +471,88 @@ class ClientCore:
             "filters[0][range][price][gte]": 1
         }
 
-        res = requests.get(url, headers=headers, params=params,
-                           proxies=self._proxy_pool.get_proxy())
+        return self._cached("search", f"{query}:{page}", lambda: self._send(
+            "search", "GET", url, self._search_response, headers, params, session=False))
+
+    def _search_response(self, res: "Response") -> dict:
+
+        data = validate_response(res, 200).json()
+
+        self._index(data["data"])
+
+        return data
+
+    def _index(self, rows: list[dict], fields: tuple = ("id", "storeprice")) -> None:
+
+        if self._catalog is not None:
+
+            # the history rows hold the account prices, and the sales history rows their order number as id
+            self._catalog.update({k: row[k] for k in ("name", "image", *fields)} for row in rows)
+
+    def _record_prices(self, sku: str, sizes: dict) -> None:
+
+        if self._price_store is not None:
+
+            self._price_store.record(sku, sizes)
 
-        return validate_response(res, 200).json()
+    def _catalog_row(self, sku: str) -> Optional[dict]:
+
+        entry = self._catalog.get(sku) if self._catalog is not None else None
+
+        # products only seen in the sales history miss their id and price
+        if entry is None or entry.id is None or entry.price is None:
+
+            return None
+
+        return {"id": str(entry.id), "name": entry.name, "image": entry.image, "storeprice": str(entry.price)}
 
     def _product_request(self, slug: str) -> str:
 
         headers = ClientCore._headers
 
-        res = requests.get(slug, headers=headers,
-                           proxies=self._proxy_pool.get_proxy())
+        validator = self._validators.get(slug)
+
+        if validator:
+
+            etag, modified, _ = validator
+
+            headers = headers | ({"If-None-Match": etag} if etag else {}) | ({"If-Modified-Since": modified} if modified else {})
+
+        return self._cached("product", slug, lambda: self._send(
+            "product", "GET", slug, lambda res: self._product_response(slug, res, validator), headers, session=False))
+
+    def _product_response(self, slug: str, res: "Response", validator: Optional[tuple]) -> str:
+
+        # a 304 answers the validator sent with the request, even if the memo evicted it in the meantime
+        if res.status_code == 304 and validator:
+
+            self._validators.set(slug, validator)
+
+            return validator[2]
 
-        return validate_response(res, 200).text
+        src = validate_response(res, 200).text
 
-    @staticmethod
-    def _product_parsing(src: str) -> dict:
+        etag, modified = res.headers.get("ETag"), res.headers.get("Last-Modified")
 
-        soup = BeautifulSoup(src, "lxml")
+        if etag or modified:
 
-        variants_list = soup.find("ul", {"class": "select__size__list"})
+            # only the size list is kept, it is all the product parsing reads
+            self._validators.set(slug, (etag, modified, _size_list_fragment(src)))
 
-        variants = variants_list.find_all("li", {"data-type": "all"})
+        return src
 
-        sizes = {}
+    def _product_parsing(self, src: str) -> dict:
 
-        for variant in variants:
+        fragment, digest = _size_list_digest(src)
 
-            oos = "out__of__stock" in variant.get("class")
+        # unchanged size lists return the same sizes dict, which callers treat as read only
+        sizes = self._parsed.get(digest)
 
-            size = variant.find("span", {"class": "text"}).text
-            size = parse_size(size)
+        if sizes is None:
 
-            price = variant.find(
-                "span", {"class": "float-right price"}).find_next("span").text
-            price = None if oos else parse_int(price)
+            sizes = self._parse("product", self._parser.product, fragment)
 
-            sizes[size] = price
+            self._parsed.set(digest, sizes)
 
         return sizes
 
@@ -239,7 +560,7 @@ class ClientCore:
 
         url = self._base_url + "/pricing"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Google Chrome";v="107", "Chromium";v="107", "Not=A?Brand";v="24"',
             'sec-ch-ua-mobile': '?0',
@@ -260,21 +581,28 @@ class ClientCore:
             'sell_method': sell_method,
         }
 
-        res = self._session.post(url, params=params)
-
-        return validate_response(res, 200).json()
+        return self._send("pricing", "POST", url, lambda res: validate_response(res, 200).json(), headers, params)
 
     def _get_sell_profit(self, store_price: int, sell_method: str) -> float:
 
-        res = self._sell_profit_request(store_price, sell_method)
+        # the payout only depends on the price and the selling method
+        key = (store_price, str(sell_method))
+
+        profit = self._sell_profits.get(key)
+
+        if profit is None:
+
+            res = self._sell_profit_request(store_price, sell_method)
+
+            profit = self._sell_profits[key] = res["payout"]["decimal"]
 
-        return res["payout"]["decimal"]
+        return profit
 
     def _validate_listing_request(self, product_id: int, size_id: int, store_price: int, price: float, sell_method: str, duration: int) -> dict:
 
         url = self._base_url + "/account/sell/validate"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Google Chrome";v="107", "Chromium";v="107", "Not=A?Brand";v="24"',
             'sec-ch-ua-mobile': '?0',
@@ -304,15 +632,13 @@ class ClientCore:
             'checkbox2_consignment': '1',
         }
 
-        res = self._session.post(url, params=params)
-
-        return validate_response(res, 200).json()
+        return self._send("sell_validate", "POST", url, lambda res: validate_response(res, 200).json(), headers, params)
 
     def _create_listing_request(self, product_id: int, sell_method: str, size_id: int, store_price: int, price: float, duration: int) -> dict:
 
         url = self._base_url + "/account/sell/create"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Google Chrome";v="107", "Chromium";v="107", "Not=A?Brand";v="24"',
             'sec-ch-ua-mobile': '?0',
@@ -342,9 +668,7 @@ class ClientCore:
             "listings[0][checkbox2_consignment]": '1'
         }
 
-        res = self._session.post(url, params=params)
-
-        return validate_response(res, 200, "invalid listing data").json()
+        return self._send("sell_create", "POST", url, lambda res: validate_response(res, 200, "invalid listing data").json(), headers, params)
 
     def _size_lowest_price_request(self, product_id: int, size_id: int) -> str:
 
@@ -364,15 +688,14 @@ class ClientCore:
             'sec-fetch-dest': 'empty',
         }
 
-        res = self._session.get(url)
-
-        return validate_response(res, 200).text
+        return self._cached("lowest_price", f"{product_id}:{size_id}", lambda: self._send(
+            "lowest_price", "GET", url, lambda res: validate_response(res, 200).text, headers))
 
     def _listings_history_request(self, query: str, page: int, sell_method: str) -> dict:
 
         url = self._base_url + f"/account/listings/{sell_method}"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Not?A_Brand";v="8", "Chromium";v="108", "Google Chrome";v="108"',
             'accept': '*/*',
@@ -389,39 +712,17 @@ class ClientCore:
             'search': query,
         }
 
-        res = self._session.get(url, params=params)
+        return self._send("listings_history", "GET", url, lambda res: validate_response(res, 200).json(), headers, params)
 
-        return validate_response(res, 200).json()
+    def _listings_history_parsing(self, src: str) -> dict:
 
-    @staticmethod
-    def _listings_history_parsing(src: str) -> dict:
-
-        soup = BeautifulSoup(src, "lxml")
-
-        sales = soup.find("tbody").find_all("tr") if soup.find("tbody") else soup.find_all("tr")
-        
-        products = []
-
-        for product in sales:
-
-            img = product.find("img")["src"]
-            id = product.find("input", {"class", "baseproductid"})["value"]
-
-            name, size, listing_id, price, date = list(
-                product.stripped_strings)
-
-            date = re.search(r'(\d+/\d+/\d+)', date).group(0)
-
-            products.append({"name": name, "size": size, "listing_id": listing_id,
-                            "id": id, "storeprice": price, "date": date, "image": img})
-
-        return products
+        return self._parse("listings_history", self._parser.listings_history, src)
 
     def _edit_listing_request(self, listing_id: int, new_price: int) -> dict:
 
         url = self._base_url + "/account/listings/edit"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Not?A_Brand";v="8", "Chromium";v="108", "Google Chrome";v="108"',
             'sec-ch-ua-mobile': '?0',
@@ -441,15 +742,13 @@ class ClientCore:
             'store_price': new_price,
         }
 
-        res = self._session.post(url, params=params)
-
-        return validate_response(res, 200, "invalid listing id").json()
+        return self._send("listing_edit", "POST", url, lambda res: validate_response(res, 200, "invalid listing id").json(), headers, params)
 
     def _delete_listing_request(self, listing_id: int) -> dict:
 
         url = self._base_url + "/account/listings/delete"
 
-        self._session.headers = {
+        headers = {
             'Host': 'restocks.net',
             'sec-ch-ua': '"Not?A_Brand";v="8", "Chromium";v="108", "Google Chrome";v="108"',
             'sec-ch-ua-mobile': '?0',
@@ -468,6 +767,4 @@ class ClientCore:
             'id': listing_id,
         }
 
-        res = self._session.post(url, params=params)
-
-        return validate_response(res, 200).json()
+        return self._send("listing_delete", "POST", url, lambda res: validate_response(res, 200).json(), headers, params)
@@ -0,0 +1,74 @@
+from typing import Iterable, NamedTuple, Optional, Union
+
+from ..exceptions import SessionException
+from ..product import SIZES_IDS, Product
+from .batch import BatchResult
+
+
+class PriceMatrix(NamedTuple):
+
+    """
+    The lowest prices of many sizes of many products, keyed by product id and size. A price is None where the size
+    is out of stock or its price could not be fetched, `errors` holds the exception raised for the latter.
+    """
+
+    prices: dict[int, dict[str, Optional[int]]]
+    errors: dict[int, dict[str, Exception]]
+
+
+class _PriceGrid:
+
+    """
+    Assembles a `PriceMatrix` from the product pages and the lowest price requests of the sizes missing from them.
+    """
+
+    def __init__(self, products: Iterable[Union[Product, int]], sizes: Optional[Iterable[str]]) -> None:
+
+        self.sizes = list(sizes or SIZES_IDS)
+
+        if any(size not in SIZES_IDS for size in self.sizes):
+
+            raise SessionException("invalid size")
+
+        self.products = [p if isinstance(p, Product) else int(p) for p in products]
+
+        # indexes of the products priced from their variants or product page, bare ids have no page to read
+        self.pages = [i for i, p in enumerate(self.products) if isinstance(p, Product)]
+
+        self._prices: dict[int, dict[str, Optional[int]]] = {}
+        self._errors: dict[int, dict[str, Exception]] = {}
+
+    def add_pages(self, results: Iterable[BatchResult]) -> list[tuple[int, str]]:
+
+        pages = {r.key: r for r in results}
+
+        for i, product in enumerate(self.products):
+
+            if isinstance(product, Product):
+
+                # a failed page only costs more requests, its sizes are requested one by one
+                prices = pages[i].value if pages[i].ok else {}
+
+                self._prices[product.id] = {size: prices[size] for size in self.sizes if size in prices}
+
+            else:
+
+                self._prices.setdefault(product, {})
+
+        return [(product_id, size) for product_id, prices in self._prices.items() for size in self.sizes if size not in prices]
+
+    def add(self, result: BatchResult) -> None:
+
+        product_id, size = result.key
+
+        self._prices[product_id][size] = result.value
+
+        if not result.ok:
+
+            self._errors.setdefault(product_id, {})[size] = result.error
+
+    def result(self) -> PriceMatrix:
+
+        prices = {product_id: {size: prices[size] for size in self.sizes} for product_id, prices in self._prices.items()}
+
+        return PriceMatrix(prices, self._errors)
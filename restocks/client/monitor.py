@@ -0,0 +1,367 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from enum import StrEnum
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from ..product import Product, Variant
+from .batch import _run_batch, _run_batch_async
+from .client import Client
+
+if TYPE_CHECKING:
+    from .async_client import AsyncClient
+
+
+class ChangeKind(StrEnum):
+
+    PriceMoved = "price_moved"
+    BackInStock = "back_in_stock"
+    WentOOS = "went_oos"
+
+
+class PriceChange(NamedTuple):
+
+    product: Product
+    size: str
+    kind: ChangeKind
+    old_price: Optional[int]
+    new_price: Optional[int]
+
+
+@dataclass(slots=True, eq=False)
+class _WatchItem:
+
+    sku: str
+    sizes: Optional[frozenset[str]]
+    interval: float
+    due: float = 0.0
+    product: Optional[Product] = None
+    prices: Optional[dict[str, Optional[int]]] = None
+    sizes_page: Optional[dict] = None
+
+
+def _variant_prices(product: Product) -> dict[str, Optional[int]]:
+
+    return {v.size: None if v.oos else v.price for v in product.variants or []}
+
+
+def _polled(item: _WatchItem, sizes: dict) -> dict[str, Optional[int]]:
+
+    prices = {size: price or None for size, price in sizes.items()}
+    in_stock = [price for price in prices.values() if price is not None]
+
+    # a new product, the changes already reported keep the one of their own poll
+    item.product = replace(item.product, variants=list(Variant._from_json(sizes)),
+                           price=min(in_stock) if in_stock else item.product.price)
+
+    return prices
+
+
+class _MonitorBase:
+
+    def __init__(self, interval: float, jitter: float, callback: Optional[Callable[[PriceChange], None]], on_error: Optional[Callable[[str, Exception], None]]) -> None:
+
+        self.interval = interval
+        self.jitter = jitter
+        self.callback = callback
+        self.on_error = on_error
+
+        self._items: dict[str, _WatchItem] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, sku: str, sizes: Iterable[str] = None, interval: float = None) -> None:
+        """
+        Adds a product to the watchlist, or updates its sizes and interval if already watched. The first poll of a
+        product only records its prices.
+
+        Args:
+            sku: the product SKU code.
+            sizes: the sizes to report changes for. Defaults to all the sizes.
+            interval: the product polling interval in seconds. Defaults to the monitor interval.
+        """
+
+        interval = interval or self.interval
+
+        with self._lock:
+
+            item = self._items.get(sku)
+
+            if item:
+
+                item.sizes = frozenset(sizes) if sizes else None
+                item.interval = interval
+
+            else:
+
+                # spreads the first polls of a large watchlist over the jitter window
+                self._items[sku] = _WatchItem(sku, frozenset(sizes) if sizes else None, interval,
+                                              time.monotonic() + random.uniform(0, interval * self.jitter))
+
+    def unwatch(self, sku: str) -> None:
+
+        with self._lock:
+
+            self._items.pop(sku, None)
+
+    @property
+    def watchlist(self) -> list[str]:
+
+        with self._lock:
+
+            return list(self._items)
+
+    def _due(self) -> list[_WatchItem]:
+
+        now = time.monotonic()
+
+        with self._lock:
+
+            items = [item for item in self._items.values() if item.due <= now]
+
+            for item in items:
+
+                item.due = now + item.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+        return items
+
+    def _wait(self) -> float:
+
+        with self._lock:
+
+            if not self._items:
+
+                return self.interval
+
+            return max(0.0, min(item.due for item in self._items.values()) - time.monotonic())
+
+    def _diff(self, item: _WatchItem, prices: dict[str, Optional[int]]) -> list[PriceChange]:
+
+        old, item.prices = item.prices, prices
+
+        if old is None or prices is old:
+
+            return []
+
+        changes = []
+
+        for size in old.keys() | prices.keys():
+
+            if item.sizes is not None and size not in item.sizes:
+
+                continue
+
+            # sizes missing from the page are not purchasable
+            before, after = old.get(size), prices.get(size)
+
+            if before == after:
+
+                continue
+
+            if before is None:
+
+                kind = ChangeKind.BackInStock
+
+            elif after is None:
+
+                kind = ChangeKind.WentOOS
+
+            else:
+
+                kind = ChangeKind.PriceMoved
+
+            changes.append(PriceChange(item.product, size, kind, before, after))
+
+        return changes
+
+    def _handle(self, results: list) -> list[PriceChange]:
+
+        changes = []
+
+        for r in results:
+
+            if not r.ok:
+
+                if self.on_error:
+
+                    self.on_error(r.key.sku, r.error)
+
+                continue
+
+            changes.extend(self._diff(r.key, r.value))
+
+        if self.callback:
+
+            for change in changes:
+
+                self.callback(change)
+
+        return changes
+
+
+class Monitor(_MonitorBase):
+
+    def __init__(self, client: Client, interval: float = 60, jitter: float = 0.1, max_workers: int = 8, callback: Callable[[PriceChange], None] = None, on_error: Callable[[str, Exception], None] = None) -> None:
+        """
+        Polls a watchlist of products and reports only the size price changes: price moves, sizes back in stock and
+        sizes going out of stock. Each product is resolved once by SKU, then only its product page is polled. Proxies
+        rotate at each request, so a client with multiple proxies spreads the polls over them.
+
+        Args:
+            client: the client used for the polls. Its `memo_size` should exceed the number of watched products, so
+            unchanged pages are neither downloaded nor parsed again.
+            interval: the default polling interval in seconds. Defaults to 60.
+            jitter: the relative random variation of the intervals, so polls do not line up. Defaults to 0.1.
+            max_workers: the maximum number of products polled at the same time. Defaults to 8.
+            callback: an optional function called with each `PriceChange`.
+            on_error: an optional function called with the SKU and the exception of each failed poll. Failed
+            polls are retried at the next interval.
+        """
+
+        super().__init__(interval, jitter, callback, on_error)
+
+        self.client = client
+        self.max_workers = max_workers
+
+    def poll(self) -> list[PriceChange]:
+        """
+        Polls the products which are due once.
+
+        Returns:
+            The changes found since the previous poll of each product.
+        """
+
+        return self._handle(list(_run_batch(self._fetch, self._due(), self.max_workers)))
+
+    def run(self, stop: threading.Event = None) -> None:
+        """
+        Polls the watchlist until stopped, reporting the changes through the callback.
+
+        Args:
+            stop: an optional event stopping the monitor when set.
+        """
+
+        stop = stop or threading.Event()
+
+        while not stop.is_set():
+
+            self.poll()
+
+            stop.wait(self._wait())
+
+    def __iter__(self) -> Iterator[PriceChange]:
+
+        while True:
+
+            yield from self.poll()
+
+            time.sleep(self._wait())
+
+    def _fetch(self, item: _WatchItem) -> dict[str, Optional[int]]:
+
+        if item.product is None:
+
+            item.product = self.client.get_product(item.sku)
+
+            return _variant_prices(item.product)
+
+        sizes = self.client._product_parsing(self.client._product_request(item.product.slug))
+
+        self.client._record_prices(item.product.sku, sizes)
+
+        # the client returns the same sizes dict for an unchanged size list
+        if sizes is not item.sizes_page:
+
+            item.sizes_page = sizes
+
+            return _polled(item, sizes)
+
+        return item.prices
+
+
+class AsyncMonitor(_MonitorBase):
+
+    def __init__(self, client: "AsyncClient", interval: float = 60, jitter: float = 0.1, max_concurrency: int = 32, callback: Callable[[PriceChange], None] = None, on_error: Callable[[str, Exception], None] = None) -> None:
+        """
+        Polls a watchlist of products with an `AsyncClient`, the same way as `Monitor`. The changes are reported
+        through the callback or by iterating the monitor with `async for`.
+
+        Args:
+            client: the client used for the polls. Its `memo_size` should exceed the number of watched products, so
+            unchanged pages are neither downloaded nor parsed again.
+            interval: the default polling interval in seconds. Defaults to 60.
+            jitter: the relative random variation of the intervals, so polls do not line up. Defaults to 0.1.
+            max_concurrency: the maximum number of products polled at the same time. Defaults to 32.
+            callback: an optional function called with each `PriceChange`.
+            on_error: an optional function called with the SKU and the exception of each failed poll. Failed
+            polls are retried at the next interval.
+        """
+
+        super().__init__(interval, jitter, callback, on_error)
+
+        self.client = client
+        self.max_concurrency = max_concurrency
+
+    async def poll(self) -> list[PriceChange]:
+        """
+        Polls the products which are due once.
+
+        Returns:
+            The changes found since the previous poll of each product.
+        """
+
+        return self._handle([r async for r in _run_batch_async(self._fetch, self._due(), self.max_concurrency)])
+
+    async def run(self, stop: asyncio.Event = None) -> None:
+        """
+        Polls the watchlist until stopped, reporting the changes through the callback.
+
+        Args:
+            stop: an optional event stopping the monitor when set.
+        """
+
+        stop = stop or asyncio.Event()
+
+        while not stop.is_set():
+
+            await self.poll()
+
+            try:
+
+                await asyncio.wait_for(stop.wait(), self._wait())
+
+            except asyncio.TimeoutError:
+
+                pass
+
+    async def __aiter__(self) -> AsyncIterator[PriceChange]:
+
+        while True:
+
+            for change in await self.poll():
+
+                yield change
+
+            await asyncio.sleep(self._wait())
+
+    async def _fetch(self, item: _WatchItem) -> dict[str, Optional[int]]:
+
+        if item.product is None:
+
+            item.product = await self.client.get_product(item.sku)
+
+            return _variant_prices(item.product)
+
+        sizes = await self.client._product_parsing(await self.client._product_request(item.product.slug))
+
+        self.client._record_prices(item.product.sku, sizes)
+
+        # the client returns the same sizes dict for an unchanged size list
+        if sizes is not item.sizes_page:
+
+            item.sizes_page = sizes
+
+            return _polled(item, sizes)
+
+        return item.prices
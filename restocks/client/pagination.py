@@ -0,0 +1,144 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Iterator
+
+from ..product import Product
+
+if TYPE_CHECKING:
+    from ..history import HistoryStore
+
+PAGE_SIZE = 48
+
+
+def _iter_pages(fetch: Callable[[int], list], prefetch: bool = False, start: int = 1) -> Iterator:
+
+    if not prefetch:
+
+        page = start
+
+        while True:
+
+            rows = fetch(page)
+
+            yield from rows
+
+            if len(rows) < PAGE_SIZE:
+
+                return
+
+            page += 1
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+
+        page = start
+        future = executor.submit(fetch, page)
+
+        try:
+
+            while True:
+
+                rows = future.result()
+
+                if len(rows) < PAGE_SIZE:
+
+                    yield from rows
+
+                    return
+
+                # the next page downloads while the current one is consumed
+                page += 1
+                future = executor.submit(fetch, page)
+
+                yield from rows
+
+        finally:
+
+            future.cancel()
+
+
+async def _iter_pages_async(fetch: Callable[[int], Awaitable[list]], prefetch: bool = False, start: int = 1) -> AsyncIterator:
+
+    page = start
+    task = asyncio.ensure_future(fetch(page))
+
+    try:
+
+        while True:
+
+            rows = await task
+
+            if len(rows) < PAGE_SIZE:
+
+                for row in rows:
+
+                    yield row
+
+                return
+
+            page += 1
+            task = asyncio.ensure_future(fetch(page)) if prefetch else None
+
+            for row in rows:
+
+                yield row
+
+            task = task or asyncio.ensure_future(fetch(page))
+
+    finally:
+
+        if task is not None:
+
+            task.cancel()
+
+
+class _HistorySync:
+
+    """
+    The paging state of a history sync, fed with the fetched pages by the sync and async clients. The rows found
+    are only stored by `commit`, once paging is done.
+    """
+
+    def __init__(self, store: "HistoryStore", kind: str, key: Callable[[dict], str], full: bool) -> None:
+
+        self.store = store
+        self.kind = kind
+        self.key = key
+        self.full = full
+
+        self.watermark = store.watermark(kind)
+        self.newest = self.watermark[0] if self.watermark else None
+
+        self.pending: dict[str, dict] = {}
+        self.pages = 0
+
+    def add(self, rows: list[dict]) -> bool:
+
+        self.pages += 1
+
+        if self.pages == 1 and rows:
+
+            self.newest = self.key(rows[0])
+
+        keyed = [(self.key(row), row) for row in rows]
+
+        # rows shifted to the next page by sales made while paging are only counted once
+        new = [(key, row) for key, row in self.store.diff(self.kind, keyed) if self.pending.get(key) != row]
+
+        self.pending.update(new)
+
+        if len(rows) < PAGE_SIZE:
+
+            return False
+
+        if not self.full and (not new or (self.watermark and self.watermark[0] in {key for key, _ in keyed})):
+
+            return False
+
+        return True
+
+    def commit(self) -> list[Product]:
+
+        self.store.commit(self.kind, list(self.pending.items()), self.newest)
+
+        return Product._from_json_many(self.pending.values())
+
@@ -0,0 +1,251 @@
+import re
+from typing import TYPE_CHECKING, Iterator, Union
+
+from ..filters import Parser
+from ..utils.helpers import parse_int, parse_size
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from lxml import etree
+
+
+def _has_class(name: str) -> str:
+
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class _XPath:
+
+    """
+    XPath selector compiled on first use, so importing the parsers does not load lxml.
+    """
+
+    __slots__ = ("expression", "_compiled")
+
+    def __init__(self, expression: str) -> None:
+
+        self.expression = expression
+        self._compiled = None
+
+    def __call__(self, element: "etree._Element") -> list:
+
+        if self._compiled is None:
+
+            from lxml import etree
+
+            self._compiled = etree.XPath(self.expression)
+
+        return self._compiled(element)
+
+
+_CSRF_TOKEN = _XPath('(//meta[@name="csrf-token"])[1]/@content')
+_SIZE_LIST = _XPath(f"//ul[{_has_class('select__size__list')}]")
+_SIZE_VARIANTS = _XPath('.//li[@data-type="all"]')
+_SIZE_TEXT = _XPath(f"(.//span[{_has_class('text')}])[1]")
+_SIZE_PRICE = _XPath("(.//span[normalize-space(@class)='float-right price'])[1]")
+_NEXT_SPAN = _XPath("(descendant::span | following::span)[1]")
+_TEXT_NODES = _XPath(".//text()")
+_BASE_PRODUCT_ID = _XPath(f"(.//input[{_has_class('baseproductid')} or {_has_class('class')}])[1]/@value")
+
+
+_SIZE_LIST_FRAGMENT = re.compile(r"<ul[^>]*select__size__list.*?</ul>", re.S)
+
+
+def _size_list_fragment(src: str) -> str:
+
+    match = _SIZE_LIST_FRAGMENT.search(src)
+
+    return match.group(0) if match else src
+
+
+def _soup(src: str) -> "BeautifulSoup":
+
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(src, "lxml")
+
+
+def _html(src: str) -> "etree._Element":
+
+    from lxml import etree
+
+    root = etree.HTML(src)
+
+    # lxml returns no root for empty documents
+    return root if root is not None else etree.Element("html")
+
+
+def _stripped_strings(element: "etree._Element") -> list[str]:
+
+    return [s for s in (t.strip() for t in _TEXT_NODES(element)) if s]
+
+
+def _text(element: "etree._Element") -> str:
+
+    return "".join(_TEXT_NODES(element))
+
+
+def _rows(root: "etree._Element") -> Iterator["etree._Element"]:
+
+    tbody = root.find(".//tbody")
+
+    return (tbody if tbody is not None else root).iterfind(".//tr")
+
+
+class SoupParser:
+
+    """
+    Parses the Restocks.net pages walking full BeautifulSoup trees.
+    """
+
+    @staticmethod
+    def csrf_token(src: str) -> Union[str, None]:
+
+        soup = _soup(src)
+
+        csrf_token = soup.find("meta", {"name": "csrf-token"})
+
+        return csrf_token.get("content") if csrf_token else None
+
+    @staticmethod
+    def sales_history(src: str) -> dict:
+
+        soup = _soup(src)
+
+        sales = soup.find("tbody").find_all("tr") if soup.find(
+            "tbody") else soup.find_all("tr")
+
+        products = []
+
+        for product in sales:
+
+            img = product.find("img")["src"]
+            name, size, id, price, date = list(product.stripped_strings)
+
+            products.append({"name": name, "size": size, "id": id,
+                            "storeprice": price, "date": date, "image": img})
+
+        return products
+
+    @staticmethod
+    def product(src: str) -> dict:
+
+        soup = _soup(src)
+
+        variants_list = soup.find("ul", {"class": "select__size__list"})
+
+        variants = variants_list.find_all("li", {"data-type": "all"})
+
+        sizes = {}
+
+        for variant in variants:
+
+            oos = "out__of__stock" in variant.get("class")
+
+            size = variant.find("span", {"class": "text"}).text
+            size = parse_size(size)
+
+            price = variant.find(
+                "span", {"class": "float-right price"}).find_next("span").text
+            price = None if oos else parse_int(price)
+
+            sizes[size] = price
+
+        return sizes
+
+    @staticmethod
+    def listings_history(src: str) -> dict:
+
+        soup = _soup(src)
+
+        sales = soup.find("tbody").find_all("tr") if soup.find("tbody") else soup.find_all("tr")
+        
+        products = []
+
+        for product in sales:
+
+            img = product.find("img")["src"]
+            id = product.find("input", {"class", "baseproductid"})["value"]
+
+            name, size, listing_id, price, date = list(
+                product.stripped_strings)
+
+            date = re.search(r'(\d+/\d+/\d+)', date).group(0)
+
+            products.append({"name": name, "size": size, "listing_id": listing_id,
+                            "id": id, "storeprice": price, "date": date, "image": img})
+
+        return products
+
+
+class LxmlParser:
+
+    """
+    Parses the Restocks.net pages with precompiled lxml XPath selectors, skipping the BeautifulSoup tree.
+
+    Its output is identical to the `SoupParser` output.
+    """
+
+    @staticmethod
+    def csrf_token(src: str) -> Union[str, None]:
+
+        csrf_token = _CSRF_TOKEN(_html(src))
+
+        return csrf_token[0] if csrf_token else None
+
+    @staticmethod
+    def sales_history(src: str) -> dict:
+
+        products = []
+
+        for product in _rows(_html(src)):
+
+            img = product.find(".//img").attrib["src"]
+            name, size, id, price, date = _stripped_strings(product)
+
+            products.append({"name": name, "size": size, "id": id,
+                            "storeprice": price, "date": date, "image": img})
+
+        return products
+
+    @staticmethod
+    def product(src: str) -> dict:
+
+        variants_list = _SIZE_LIST(_html(src))[0]
+
+        sizes = {}
+
+        for variant in _SIZE_VARIANTS(variants_list):
+
+            oos = "out__of__stock" in variant.attrib["class"].split()
+
+            size = parse_size(_text(_SIZE_TEXT(variant)[0]))
+
+            price = _text(_NEXT_SPAN(_SIZE_PRICE(variant)[0])[0])
+            price = None if oos else parse_int(price)
+
+            sizes[size] = price
+
+        return sizes
+
+    @staticmethod
+    def listings_history(src: str) -> dict:
+
+        products = []
+
+        for product in _rows(_html(src)):
+
+            img = product.find(".//img").attrib["src"]
+            id = _BASE_PRODUCT_ID(product)[0]
+
+            name, size, listing_id, price, date = _stripped_strings(product)
+
+            date = re.search(r'(\d+/\d+/\d+)', date).group(0)
+
+            products.append({"name": name, "size": size, "listing_id": listing_id,
+                            "id": id, "storeprice": price, "date": date, "image": img})
+
+        return products
+
+
+_PARSERS = {Parser.Soup: SoupParser, Parser.Lxml: LxmlParser}
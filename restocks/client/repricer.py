@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Callable, NamedTuple, Optional, Union
+
+from ..filters import SellMethod
+from ..product import Product
+from .batch import _run_batch
+from .client import Client
+
+
+@dataclass(slots=True)
+class PricingRule:
+
+    """
+    Undercuts the lowest price of a size by a fixed amount, within optional price bounds.
+    Listings which already hold the lowest price keep it.
+    """
+
+    undercut: int = 1
+    floor: Optional[int] = None
+    ceiling: Optional[int] = None
+
+    def __call__(self, listing: Product, lowest: int) -> int:
+
+        price = listing.price if listing.price <= lowest else lowest - self.undercut
+
+        if self.floor is not None:
+
+            price = max(price, self.floor)
+
+        if self.ceiling is not None:
+
+            price = min(price, self.ceiling)
+
+        return price
+
+
+class RepriceResult(NamedTuple):
+
+    listing: Product
+    lowest: Optional[int]
+    old_price: int
+    new_price: Optional[int]
+    edited: bool
+    error: Optional[Exception]
+
+    @property
+    def changed(self) -> bool:
+
+        return self.new_price is not None and self.new_price != self.old_price
+
+
+class Repricer:
+
+    def __init__(self, client: Client, rule: Union[PricingRule, Callable[[Product, int], int]] = None, max_workers: int = 8) -> None:
+        """
+        Reprices all the active listings of a logged in account.
+
+        Args:
+            client: a logged in client.
+            rule: the pricing rule, any callable taking a listing and its size lowest price and returning the new
+            price. Defaults to `PricingRule()`, undercutting the lowest price by 1.
+            max_workers: the maximum number of requests made at the same time. Defaults to 8.
+        """
+
+        self.client = client
+        self.rule = rule or PricingRule()
+        self.max_workers = max_workers
+
+    def run(self, sell_method: SellMethod = SellMethod.Resell, dry_run: bool = False) -> list[RepriceResult]:
+        """
+        Fetches the lowest price of every listed product size once, applies the pricing rule and edits only the
+        listings whose price changes.
+
+        Args:
+            sell_method: the listings selling method. Defaults to `SellMethod.Resell`.
+            dry_run: whether to only compute the new prices without editing the listings. Defaults to False.
+
+        Returns:
+            A `RepriceResult` per listing. On a dry run, the results with `changed` set make up the diff.
+        """
+
+        listings = list(self.client.iter_listings_history(sell_method=sell_method, prefetch=True))
+
+        keys = {(listing.id, listing.size) for listing in listings}
+
+        lowest = {r.key: r for r in _run_batch(lambda key: self.client.get_size_lowest_price(*key), keys, self.max_workers)}
+
+        results = []
+
+        for listing in listings:
+
+            price = lowest[(listing.id, listing.size)]
+
+            if price.ok:
+
+                results.append(RepriceResult(listing, price.value, listing.price, self.rule(listing, price.value), False, None))
+
+            else:
+
+                results.append(RepriceResult(listing, None, listing.price, None, False, price.error))
+
+        if dry_run:
+
+            return results
+
+        edits = [i for i, result in enumerate(results) if result.changed]
+
+        def edit(i: int) -> bool:
+
+            return self.client.edit_listing(results[i].listing.listing_id, results[i].new_price)
+
+        for r in _run_batch(edit, edits, self.max_workers):
+
+            results[r.key] = results[r.key]._replace(edited=bool(r.value), error=r.error)
+
+        return results
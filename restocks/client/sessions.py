@@ -0,0 +1,172 @@
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Iterable, Union
+
+from ..exceptions import SessionExpiredException
+from .batch import BatchResult, _run_batch
+from .client import Client
+
+
+class SessionManager:
+
+    def __init__(self, accounts: dict[str, str], directory: str = None, proxy: Union[dict, list] = None, max_workers: int = 8, **client_kwargs) -> None:
+        """
+        Manages multiple logged in Restocks.net accounts, each one with its own client.
+
+        Args:
+            accounts: the accounts passwords keyed by email.
+            directory: a directory where the session cookies and tokens are persisted, so restarts skip the login
+            flow. Passwords are never written. Defaults to None, which disables persistence.
+            proxy: a single or multiple proxies shared by the accounts clients. Defaults to None.
+            max_workers: the maximum number of accounts logged in at the same time. Defaults to 8.
+            client_kwargs: extra arguments passed to every `Client`.
+        """
+
+        self.accounts = dict(accounts)
+        self.directory = directory
+        self.max_workers = max_workers
+
+        self._clients = {email: Client(proxy=proxy, **client_kwargs) for email in self.accounts}
+        self._locks = {email: threading.Lock() for email in self.accounts}
+
+        if directory:
+
+            os.makedirs(directory, exist_ok=True)
+
+    def login_all(self, force: bool = False) -> list[BatchResult]:
+        """
+        Logs in all the accounts concurrently. Accounts with a persisted session are restored without logging in.
+
+        Args:
+            force: whether to log in again the accounts with a persisted session. Defaults to False.
+
+        Returns:
+            A `BatchResult` per account email, holding the error raised while logging in, if any.
+        """
+
+        return list(_run_batch(lambda email: self._ensure_login(email, force), self.accounts, self.max_workers))
+
+    def client(self, email: str) -> Client:
+        """
+        Gets the logged in client of an account, logging it in or restoring its session first if needed.
+
+        Args:
+            email: the account email.
+        """
+
+        self._ensure_login(email)
+
+        return self._clients[email]
+
+    def call(self, email: str, fn: Callable[[Client], Any]) -> Any:
+        """
+        Runs an account scoped call, logging the account in again and retrying once if its session expired.
+
+        Args:
+            email: the account email.
+            fn: a function calling the client methods, e.g. `lambda client: client.get_sales_history()`.
+
+        Returns:
+            The function result.
+        """
+
+        client = self.client(email)
+
+        token = client._session_token
+
+        try:
+
+            return fn(client)
+
+        except SessionExpiredException:
+
+            self._ensure_login(email, expired=token)
+
+            return fn(client)
+
+    def map(self, fn: Callable[[Client], Any], emails: Iterable[str] = None) -> list[BatchResult]:
+        """
+        Runs an account scoped call concurrently for many accounts.
+
+        Args:
+            fn: a function calling the client methods.
+            emails: the accounts emails. Defaults to all the accounts.
+
+        Returns:
+            A `BatchResult` per account email.
+        """
+
+        return list(_run_batch(lambda email: self.call(email, fn), emails or self.accounts, self.max_workers))
+
+    def save(self, email: str) -> None:
+        """
+        Persists the session of an account to the sessions directory.
+        """
+
+        if not self.directory:
+
+            return
+
+        path = self._path(email)
+
+        # the file holds live session cookies, it is only ever readable by its owner
+        fd = os.open(path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+        with open(fd, "w", encoding="utf-8") as f:
+
+            json.dump({"email": email, **self._clients[email]._export_session()}, f)
+
+        os.replace(path + ".tmp", path)
+
+    def close(self) -> None:
+
+        for client in self._clients.values():
+
+            client.close()
+
+    def _ensure_login(self, email: str, force: bool = False, expired: str = None) -> None:
+
+        client = self._clients[email]
+
+        with self._locks[email]:
+
+            if expired is not None:
+
+                # concurrent calls hitting the same expired session log in once, the others reuse the new session
+                if client._session_token != expired:
+
+                    return
+
+                force = True
+
+            if client._session_token and not force:
+
+                return
+
+            if not force and self._restore(email):
+
+                return
+
+            client.login(email, self.accounts[email])
+
+            self.save(email)
+
+    def _restore(self, email: str) -> bool:
+
+        if not self.directory or not os.path.exists(self._path(email)):
+
+            return False
+
+        with open(self._path(email), encoding="utf-8") as f:
+
+            state = json.load(f)
+
+        self._clients[email]._import_session(state)
+
+        return bool(state.get("session_token"))
+
+    def _path(self, email: str) -> str:
+
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", email) + ".json")
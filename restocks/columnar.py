@@ -0,0 +1,201 @@
+import csv
+import math
+from array import array
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Self
+
+from .product import SIZES_IDS, Product, Variant
+
+SIZES = list(SIZES_IDS)
+
+_SIZE_INDEX = {size: i for i, size in enumerate(SIZES)}
+
+# variant price markers, prices are never negative
+_OOS = -1
+_MISSING = -2
+
+
+class ProductTable:
+
+    def __init__(self) -> None:
+        """
+        Columnar container of many products. Scalar fields are stored as one column each and the variant prices
+        as a single flat array with one slot per product and size, following the `SIZES_IDS` order. Products
+        read back from the table list their variants in that order.
+        """
+
+        self.names: list[str] = []
+        self.skus: list[str] = []
+        self.slugs: list[str] = []
+        self.images: list[str] = []
+        self.ids = array("q")
+        self.prices = array("q")
+        self.listing_ids = array("q")
+        self.sizes: list[Optional[str]] = []
+        self.dates = array("d")
+
+        self._variants = array("q")
+        self._has_variants = array("b")
+        self._extra: dict[int, list[Variant]] = {}
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> Self:
+
+        table = cls()
+        table.extend(products)
+
+        return table
+
+    def __len__(self) -> int:
+
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> Product:
+
+        if index < 0:
+
+            index += len(self)
+
+        if not 0 <= index < len(self):
+
+            raise IndexError("product table index out of range")
+
+        return Product(
+            name=self.names[index],
+            sku=self.skus[index],
+            slug=self.slugs[index],
+            image=self.images[index],
+            id=self.ids[index],
+            price=self.prices[index],
+            listing_id=None if self.listing_ids[index] < 0 else self.listing_ids[index],
+            size=self.sizes[index],
+            variants=self._row_variants(index) if self._has_variants[index] else None,
+            date=None if math.isnan(self.dates[index]) else datetime.fromtimestamp(self.dates[index])
+        )
+
+    def __iter__(self) -> Iterator[Product]:
+
+        return (self[i] for i in range(len(self)))
+
+    def to_products(self) -> list[Product]:
+
+        return list(self)
+
+    def append(self, product: Product) -> None:
+
+        index = len(self)
+
+        self.names.append(product.name)
+        self.skus.append(product.sku)
+        self.slugs.append(product.slug)
+        self.images.append(product.image)
+        self.ids.append(product.id)
+        self.prices.append(product.price)
+        self.listing_ids.append(-1 if product.listing_id is None else product.listing_id)
+        self.sizes.append(product.size)
+        self.dates.append(math.nan if product.date is None else product.date.timestamp())
+
+        row = array("q", [_MISSING]) * len(SIZES)
+
+        for variant in product.variants or []:
+
+            i = _SIZE_INDEX.get(variant.size)
+
+            if i is None:
+
+                self._extra.setdefault(index, []).append(variant)
+
+            else:
+
+                row[i] = _OOS if variant.price is None else variant.price
+
+        self._variants.extend(row)
+        self._has_variants.append(product.variants is not None)
+
+    def extend(self, products: Iterable[Product]) -> None:
+
+        for product in products:
+
+            self.append(product)
+
+    def variant_prices(self, size: str) -> list[Optional[int]]:
+        """
+        Gets the price column of a size, holding None for the products where the size is out of stock or not listed.
+        """
+
+        i = _SIZE_INDEX[size]
+
+        return [p if p >= 0 else None for p in self._variants[i::len(SIZES)]]
+
+    def _row_variants(self, index: int) -> list[Variant]:
+
+        row = self._variants[index * len(SIZES):(index + 1) * len(SIZES)]
+
+        variants = [Variant(size=size, price=None if price == _OOS else price, oos=price == _OOS or not price)
+                    for size, price in zip(SIZES, row) if price != _MISSING]
+
+        return variants + self._extra.get(index, [])
+
+    def _columns(self) -> dict[str, list]:
+
+        columns = {
+            "name": self.names,
+            "sku": self.skus,
+            "slug": self.slugs,
+            "image": self.images,
+            "id": list(self.ids),
+            "price": list(self.prices),
+            "listing_id": [None if i < 0 else i for i in self.listing_ids],
+            "size": self.sizes,
+            "date": [None if math.isnan(d) else datetime.fromtimestamp(d) for d in self.dates],
+        }
+
+        for size in SIZES:
+
+            columns[f"size_{size}"] = self.variant_prices(size)
+
+        return columns
+
+    def to_csv(self, path: str) -> None:
+        """
+        Writes the table to a CSV file, with one price column per size.
+        """
+
+        columns = self._columns()
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(zip(*columns.values()))
+
+    def to_arrow(self) -> "pyarrow.Table":
+        """
+        Converts the table to a `pyarrow.Table`, with one price column per size. Requires pyarrow.
+        """
+
+        try:
+
+            import pyarrow
+
+        except ImportError:
+
+            raise ImportError("pyarrow is required for Arrow and Parquet exports, install it with `pip install restocks-client[arrow]`")
+
+        types = {"name": pyarrow.string(), "sku": pyarrow.string(), "slug": pyarrow.string(), "image": pyarrow.string(),
+                 "size": pyarrow.string(), "date": pyarrow.timestamp("us")}
+
+        # all-null size columns would otherwise be typed as null
+        return pyarrow.table({name: pyarrow.array(values, type=types.get(name, pyarrow.int64()))
+                              for name, values in self._columns().items()})
+
+    def to_parquet(self, path: str) -> None:
+        """
+        Writes the table to a Parquet file, with one price column per size. Requires pyarrow.
+        """
+
+        table = self.to_arrow()
+
+        import pyarrow.parquet
+
+        pyarrow.parquet.write_table(table, path)
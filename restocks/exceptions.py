@@ -9,6 +9,12 @@ class SessionException(Exception):
     """
     Base Exception for possible errors while logged in.
     """
+
+class SessionExpiredException(SessionException):
+
+    """
+    Exception raised when the logged in session is no longer valid.
+    """
     
 class RequestException(Exception):
     
@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Any, Callable, Iterable
+
+
+class ParseExecutor:
+
+    def __init__(self, max_workers: int = None, min_size: int = 4096, mp_context: BaseContext = None) -> None:
+        """
+        Process pool parsing the pages of the clients it is given to, so the parsing of large batches of pages
+        uses every core while the requests keep being sent from the client threads or event loop. The parsed
+        results are the same as when parsing in process. The worker processes start with the first offloaded page.
+
+        Args:
+            max_workers: the number of worker processes. Defaults to the number of CPUs.
+            min_size: pages shorter than this many characters are parsed in the calling thread, where they cost
+            less than the transfer to a worker. Defaults to 4096.
+            mp_context: an optional multiprocessing context starting the workers.
+        """
+
+        self.max_workers = max_workers
+        self.min_size = min_size
+
+        self._mp_context = mp_context
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+
+        if self._pool is None:
+
+            with self._lock:
+
+                if self._pool is None:
+
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._mp_context)
+
+        return self._pool
+
+    def submit(self, parse: Callable[[str], Any], src: str) -> Future:
+        """
+        Parses a page in a worker process, or in the calling thread if it is shorter than `min_size`.
+
+        Args:
+            parse: a module level parsing function, such as `LxmlParser.product`, so it can be sent to the workers.
+            src: the page source.
+
+        Returns:
+            A future resolving to the parsed result.
+        """
+
+        if len(src) >= self.min_size:
+
+            return self._get_pool().submit(parse, src)
+
+        future = Future()
+
+        try:
+
+            future.set_result(parse(src))
+
+        except Exception as e:
+
+            future.set_exception(e)
+
+        return future
+
+    def map(self, parse: Callable[[str], Any], sources: Iterable[str]) -> list:
+        """
+        Parses a batch of pages across the worker processes.
+
+        Args:
+            parse: a module level parsing function, such as `LxmlParser.listings_history`.
+            sources: the pages sources.
+
+        Raises:
+            Exception: the error of the first page, in order, which could not be parsed.
+
+        Returns:
+            The parsed results, in the order of the sources.
+        """
+
+        futures = [self.submit(parse, src) for src in sources]
+
+        return [future.result() for future in futures]
+
+    def close(self, wait: bool = True) -> None:
+
+        with self._lock:
+
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, *args) -> None:
+
+        self.close()
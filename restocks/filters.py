@@ -10,3 +10,8 @@ class SellMethod(StrEnum):
 
     Consign = "consign"
     Resell = "resale"
+
+class Parser(StrEnum):
+
+    Soup = "soup"
+    Lxml = "lxml"
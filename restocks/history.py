@@ -0,0 +1,97 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class HistoryStore:
+
+    def __init__(self, path: str = "restocks-history.sqlite") -> None:
+        """
+        Local sqlite store of the account sales and listings history rows, used by the clients incremental sync.
+
+        Args:
+            path: the database file path. Defaults to "restocks-history.sqlite".
+        """
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        with self._conn:
+
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS history (kind TEXT, key TEXT, data TEXT, updated REAL, PRIMARY KEY (kind, key))")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS watermarks (kind TEXT PRIMARY KEY, key TEXT, synced REAL)")
+
+    def diff(self, kind: str, rows: list[tuple[str, dict]]) -> list[tuple[str, dict]]:
+        """
+        Compares a page of history rows with the stored ones, without storing them.
+
+        Args:
+            kind: the history the rows belong to.
+            rows: the parsed rows with their unique key.
+
+        Returns:
+            The rows, with their key, which are not stored yet or changed since they were stored.
+        """
+
+        changed = []
+
+        with self._lock:
+
+            for key, row in rows:
+
+                stored = self._conn.execute(
+                    "SELECT data FROM history WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+
+                if not stored or stored[0] != json.dumps(row, sort_keys=True):
+
+                    changed.append((key, row))
+
+        return changed
+
+    def commit(self, kind: str, rows: list[tuple[str, dict]], watermark: Optional[str]) -> None:
+        """
+        Stores the rows found by a sync and its watermark in a single transaction, so an interrupted sync stores
+        nothing and its rows are found again by the next one.
+
+        Args:
+            kind: the history the rows belong to.
+            rows: the parsed rows with their unique key.
+            watermark: the key of the newest row seen by the sync.
+        """
+
+        now = time.time()
+
+        with self._lock, self._conn:
+
+            self._conn.executemany("INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?)",
+                                   [(kind, key, json.dumps(row, sort_keys=True), now) for key, row in rows])
+            self._conn.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)", (kind, watermark, now))
+
+    def watermark(self, kind: str) -> Optional[tuple[str, float]]:
+        """
+        Gets the key of the newest row seen by the last sync of a history and the time of that sync.
+        """
+
+        with self._lock:
+
+            row = self._conn.execute("SELECT key, synced FROM watermarks WHERE kind = ?", (kind,)).fetchone()
+
+        return tuple(row) if row else None
+
+    def rows(self, kind: str) -> list[dict]:
+        """
+        Gets all the stored rows of a history.
+        """
+
+        with self._lock:
+
+            rows = self._conn.execute("SELECT data FROM history WHERE kind = ? ORDER BY updated", (kind,)).fetchall()
+
+        return [json.loads(data) for data, in rows]
+
+    def close(self) -> None:
+
+        self._conn.close()
@@ -0,0 +1,188 @@
+import threading
+from typing import Callable, NamedTuple, Optional, Union
+
+
+class RequestEvent(NamedTuple):
+
+    """
+    A single HTTP attempt. Retries of a request are reported as separate events with a growing `attempt`.
+    Timings are in seconds, `dns`, `connect` and `ttfb` are None when the transport does not expose them.
+    """
+
+    endpoint: str
+    method: str
+    url: str
+    proxy: str
+    attempt: int
+    status_code: Optional[int]
+    bytes: int
+    total: float
+    ttfb: Optional[float]
+    connect: Optional[float]
+    dns: Optional[float]
+    error: Optional[Exception]
+
+
+class ParseEvent(NamedTuple):
+
+    """
+    A single page or response parsing, timed in seconds.
+    """
+
+    name: str
+    bytes: int
+    total: float
+
+
+Event = Union[RequestEvent, ParseEvent]
+
+
+class Instrumentation:
+
+    def __init__(self) -> None:
+        """
+        Event bus receiving a `RequestEvent` for every HTTP attempt and a `ParseEvent` for every parsing made by
+        the clients it is given to. Listeners are called synchronously, from the thread or event loop making the
+        request, so they should be quick.
+        """
+
+        self._listeners: list[Callable[[Event], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Callable[[Event], None]) -> Callable[[Event], None]:
+        """
+        Adds a listener called with each event. Returns the listener, so it can be used as a decorator.
+        """
+
+        with self._lock:
+
+            self._listeners = self._listeners + [listener]
+
+        return listener
+
+    def unsubscribe(self, listener: Callable[[Event], None]) -> None:
+
+        with self._lock:
+
+            self._listeners = [l for l in self._listeners if l is not listener]
+
+    def emit(self, event: Event) -> None:
+
+        # the listeners list is replaced, never mutated, so it can be read without the lock
+        for listener in self._listeners:
+
+            listener(event)
+
+
+class PrometheusExporter:
+
+    def __init__(self, instrumentation: Instrumentation, registry: "prometheus_client.CollectorRegistry" = None, namespace: str = "restocks") -> None:
+        """
+        Records the instrumentation events as Prometheus metrics: request durations, time to first byte, bytes,
+        retries and errors per endpoint and proxy, and parsing durations per parser. Requires prometheus_client.
+
+        Args:
+            instrumentation: the instrumentation of the clients to export.
+            registry: the registry of the metrics. Defaults to the prometheus_client default registry.
+            namespace: the metrics names prefix. Defaults to "restocks".
+        """
+
+        try:
+
+            import prometheus_client
+
+        except ImportError:
+
+            raise ImportError("prometheus_client is required for the Prometheus exporter, install it with `pip install restocks-client[prometheus]`")
+
+        registry = registry or prometheus_client.REGISTRY
+
+        self._request_seconds = prometheus_client.Histogram(
+            "request_seconds", "HTTP attempts duration.", ["endpoint", "status"], namespace=namespace, registry=registry)
+        self._ttfb_seconds = prometheus_client.Histogram(
+            "request_ttfb_seconds", "HTTP attempts time to first byte.", ["endpoint"], namespace=namespace, registry=registry)
+        self._request_bytes = prometheus_client.Counter(
+            "request_bytes", "HTTP response body bytes.", ["endpoint"], namespace=namespace, registry=registry)
+        self._retries = prometheus_client.Counter(
+            "request_retries", "HTTP retries.", ["endpoint"], namespace=namespace, registry=registry)
+        self._proxy_requests = prometheus_client.Counter(
+            "proxy_requests", "HTTP attempts per proxy.", ["proxy", "status"], namespace=namespace, registry=registry)
+        self._parse_seconds = prometheus_client.Histogram(
+            "parse_seconds", "Parsing duration.", ["name"], namespace=namespace, registry=registry)
+
+        instrumentation.subscribe(self)
+
+    def __call__(self, event: Event) -> None:
+
+        if isinstance(event, ParseEvent):
+
+            self._parse_seconds.labels(event.name).observe(event.total)
+
+            return
+
+        status = str(event.status_code) if event.status_code is not None else "error"
+
+        self._request_seconds.labels(event.endpoint, status).observe(event.total)
+        self._request_bytes.labels(event.endpoint).inc(event.bytes)
+        self._proxy_requests.labels(event.proxy, status).inc()
+
+        if event.ttfb is not None:
+
+            self._ttfb_seconds.labels(event.endpoint).observe(event.ttfb)
+
+        if event.attempt:
+
+            self._retries.labels(event.endpoint).inc()
+
+
+class OpenTelemetryExporter:
+
+    def __init__(self, instrumentation: Instrumentation, meter: "opentelemetry.metrics.Meter" = None) -> None:
+        """
+        Records the instrumentation events as OpenTelemetry metrics, with the endpoint, status and proxy as
+        attributes. Requires opentelemetry-api, and an SDK meter provider for the metrics to be exported.
+
+        Args:
+            instrumentation: the instrumentation of the clients to export.
+            meter: the meter creating the instruments. Defaults to the "restocks" meter of the global provider.
+        """
+
+        try:
+
+            from opentelemetry import metrics
+
+        except ImportError:
+
+            raise ImportError("opentelemetry-api is required for the OpenTelemetry exporter, install it with `pip install restocks-client[otel]`")
+
+        meter = meter or metrics.get_meter("restocks")
+
+        self._request_duration = meter.create_histogram("restocks.request.duration", unit="s", description="HTTP attempts duration.")
+        self._request_ttfb = meter.create_histogram("restocks.request.ttfb", unit="s", description="HTTP attempts time to first byte.")
+        self._request_bytes = meter.create_counter("restocks.request.bytes", unit="By", description="HTTP response body bytes.")
+        self._retries = meter.create_counter("restocks.request.retries", description="HTTP retries.")
+        self._parse_duration = meter.create_histogram("restocks.parse.duration", unit="s", description="Parsing duration.")
+
+        instrumentation.subscribe(self)
+
+    def __call__(self, event: Event) -> None:
+
+        if isinstance(event, ParseEvent):
+
+            self._parse_duration.record(event.total, {"name": event.name})
+
+            return
+
+        attributes = {"endpoint": event.endpoint, "proxy": event.proxy,
+                      "status": str(event.status_code) if event.status_code is not None else "error"}
+
+        self._request_duration.record(event.total, attributes)
+        self._request_bytes.add(event.bytes, {"endpoint": event.endpoint})
+
+        if event.ttfb is not None:
+
+            self._request_ttfb.record(event.ttfb, {"endpoint": event.endpoint})
+
+        if event.attempt:
+
+            self._retries.add(1, {"endpoint": event.endpoint})
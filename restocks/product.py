@@ -1,18 +1,30 @@
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 import re
-from typing import NamedTuple, Optional, Self
+from typing import Iterable, NamedTuple, Optional, Self
 from .utils.helpers import parse_int, parse_size
 
 SIZES_IDS = {"35.5": 54, "36": 1, "36.5": 13, "37.5": 44, "38": 3, "38.5": 48, "39": 4, "40": 5, "40.5": 22, "41": 6, "42": 7, "42.5": 23, "43": 8, "44": 9, "44.5": 24, "45": 10, "45.5": 41, "46": 11, "47": 49, "47.5": 25, "48": 21, "48.5": 26, "49.5": 42}
 
+_IMAGE_SUFFIX = re.compile("-[0-9]+-[0-9]+.png")
+_IMAGE_SKU = re.compile('/products/(.*?)/')
+
+# the same products come back across search pages, histories and polls, so images are resolved once
+@lru_cache(maxsize=4096)
 def _image_to_slug(image: str) -> str:
     
-    return "https://restocks.net/p/" + re.sub("-[0-9]+-[0-9]+.png", "", image.split("/")[-1])
+    return "https://restocks.net/p/" + _IMAGE_SUFFIX.sub("", image.split("/")[-1])
 
+@lru_cache(maxsize=4096)
 def _image_to_sku(image: str) -> str:
     
-    return re.findall('/products/(.*?)/', image)[0]
+    return _IMAGE_SKU.findall(image)[0]
+
+@lru_cache(maxsize=1024)
+def _parse_date(date: str) -> datetime:
+    
+    return datetime.strptime(date, "%d/%m/%y")
     
 
 class Variant(NamedTuple):
@@ -28,7 +40,7 @@ class Variant(NamedTuple):
             
             yield Variant(size=size, price=price, oos=not price)
             
-@dataclass
+@dataclass(slots=True)
 class Product:
     
     name: str
@@ -56,5 +68,11 @@ class Product:
             listing_id=parse_int(data["listing_id"]) if data.get("listing_id") else None,
             size=parse_size(data["size"]) if data.get("size") else None,
             variants=[v for v in Variant._from_json(data["variants"])] if data.get("variants") else None,
-            date=datetime.strptime(data["date"], "%d/%m/%y") if data.get("date") else None
-        )
\ No newline at end of file
+            date=_parse_date(data["date"]) if data.get("date") else None
+        )
+    
+    @classmethod
+    def _from_json_many(cls, rows: Iterable[dict]) -> list[Self]:
+        
+        # the repeated images, sizes and dates of a page hit the memoized helpers of _from_json
+        return [cls._from_json(data) for data in rows]
@@ -0,0 +1,215 @@
+import math
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class _TokenBucket:
+
+    def __init__(self, rate: Optional[float], burst: int, min_rate: float) -> None:
+
+        self.limit = rate or math.inf
+        self.rate = self.limit
+        self.burst = burst
+        self.min_rate = min_rate
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._sent = deque()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+
+        with self._lock:
+
+            now = time.monotonic()
+
+            self._sent.append(now)
+
+            while self._sent[0] < now - 1:
+
+                self._sent.popleft()
+
+            if self.rate == math.inf:
+
+                return 0.0
+
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # tokens may go negative, each caller waits for the slot it reserved
+            self._tokens -= 1
+
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def decrease(self, factor: float) -> None:
+
+        with self._lock:
+
+            if self.rate == math.inf:
+
+                # starts limiting from the throughput observed over the last second
+                self.rate = float(max(len(self._sent), self.burst))
+                self._tokens = 0.0
+                self._updated = time.monotonic()
+
+            self.rate = max(self.min_rate, self.rate * factor)
+
+    def increase(self, step: float) -> None:
+
+        with self._lock:
+
+            if self.rate != math.inf:
+
+                self.rate = min(self.limit, self.rate + step)
+
+
+class RequestScheduler:
+
+    def __init__(self, rate: float = None, endpoint_rates: dict = None, burst: int = 5, retries: int = 3, backoff: float = 0.5, max_backoff: float = 30.0, adaptive: bool = True, min_rate: float = 0.2) -> None:
+        """
+        Schedules the requests of a client through token buckets per proxy and per endpoint, and retries the
+        throttled and failed requests with jittered exponential backoff.
+
+        Args:
+            rate: the maximum requests per second of each proxy. Defaults to None, which is unlimited until throttled.
+            endpoint_rates: the maximum requests per second of each endpoint, keyed by endpoint name (e.g. "search",
+            "product", "lowest_price"). Defaults to None.
+            burst: the number of requests which can be sent at once before the rates apply. Defaults to 5.
+            retries: the maximum number of retries of a request. Defaults to 3.
+            backoff: the base delay in seconds between retries, doubled at each attempt. Defaults to 0.5.
+            max_backoff: the maximum delay in seconds between retries. Defaults to 30.
+            adaptive: whether rates are lowered on 429s and errors and raised back on successes. Defaults to True.
+            min_rate: the lowest requests per second an adaptive rate can reach. Defaults to 0.2.
+        """
+
+        self.rate = rate
+        self.endpoint_rates = endpoint_rates or {}
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+
+        self._proxy_buckets = {}
+        self._endpoint_buckets = {}
+        self._lock = threading.Lock()
+
+    def _buckets(self, endpoint: str, proxy: str) -> tuple[_TokenBucket, _TokenBucket]:
+
+        with self._lock:
+
+            if proxy not in self._proxy_buckets:
+
+                self._proxy_buckets[proxy] = _TokenBucket(self.rate, self.burst, self.min_rate)
+
+            if endpoint not in self._endpoint_buckets:
+
+                self._endpoint_buckets[endpoint] = _TokenBucket(self.endpoint_rates.get(endpoint), self.burst, self.min_rate)
+
+            return self._proxy_buckets[proxy], self._endpoint_buckets[endpoint]
+
+    @property
+    def rates(self) -> dict:
+        """
+        The current requests per second of each proxy and endpoint, None when unlimited.
+        """
+
+        def current(bucket: _TokenBucket) -> Optional[float]:
+
+            return None if bucket.rate == math.inf else bucket.rate
+
+        with self._lock:
+
+            return {
+                "proxies": {proxy: current(b) for proxy, b in self._proxy_buckets.items()},
+                "endpoints": {endpoint: current(b) for endpoint, b in self._endpoint_buckets.items()},
+            }
+
+    def acquire(self, endpoint: str, proxy: str) -> float:
+        """
+        Reserves a request slot.
+
+        Returns:
+            The delay in seconds to wait before sending the request.
+        """
+
+        return max(bucket.reserve() for bucket in self._buckets(endpoint, proxy))
+
+    def report(self, endpoint: str, proxy: str, method: str, attempt: int, status_code: Optional[int], retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Reports the outcome of a request, adapting the rates.
+
+        Args:
+            endpoint: the endpoint name.
+            proxy: the proxy key.
+            method: the HTTP method.
+            attempt: the number of retries already made.
+            status_code: the response status code, None if the request failed without a response.
+            retry_after: the response Retry-After header. Defaults to None.
+
+        Returns:
+            The delay in seconds before retrying the request, None if it should not be retried.
+        """
+
+        throttled = status_code == 429
+        failed = status_code is None or status_code in RETRY_STATUS_CODES
+
+        if self.adaptive:
+
+            proxy_bucket, endpoint_bucket = self._buckets(endpoint, proxy)
+
+            # connection errors tell about the proxy, not about the endpoint
+            buckets = [proxy_bucket] if status_code is None else [proxy_bucket, endpoint_bucket]
+
+            for bucket in buckets:
+
+                if throttled:
+
+                    bucket.decrease(0.5)
+
+                elif failed:
+
+                    bucket.decrease(0.8)
+
+                else:
+
+                    bucket.increase(self.min_rate)
+
+        # non idempotent requests are only retried when the server refused them
+        if not failed or attempt >= self.retries or (method != "GET" and not throttled):
+
+            return None
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+        return max(delay, _parse_retry_after(retry_after))
+
+
+def _parse_retry_after(value: Optional[str]) -> float:
+
+    if not value:
+
+        return 0.0
+
+    try:
+
+        return max(0.0, float(value))
+
+    except ValueError:
+
+        pass
+
+    try:
+
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+
+    except (TypeError, ValueError):
+
+        return 0.0
@@ -0,0 +1,309 @@
+import bisect
+import mmap
+import os
+import statistics
+import threading
+import time
+from array import array
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, Mapping, NamedTuple, Optional, Union
+
+from .product import Product
+
+# one fixed width file per column, in the machine byte order, rows are appended in time order
+_COLUMNS = {"time": "d", "product": "i", "size": "h", "price": "i"}
+
+# price marker of out of stock sizes, prices are never negative
+_OOS = -1
+
+
+class PriceSeries(NamedTuple):
+
+    """
+    The recorded prices of a size, in time order. Times are unix timestamps and out of stock prices are None.
+    """
+
+    times: array
+    prices: list[Optional[int]]
+
+
+class SizeStats(NamedTuple):
+
+    """
+    The aggregated prices of a size over a window. `min` and `median` only count the in stock records, `last`
+    is None if the size was out of stock when last recorded.
+    """
+
+    count: int
+    in_stock: int
+    min: Optional[int]
+    median: Optional[float]
+    last: Optional[int]
+    last_time: float
+
+
+def _timestamp(value: Union[datetime, float]) -> float:
+
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+class PriceStore:
+
+    def __init__(self, path: str = "restocks-prices") -> None:
+        """
+        Append-only time series of the size prices and stock states of products, stored in a directory as one
+        compact binary file per column. The SKU codes and sizes are stored once in dictionary files and referenced
+        by index. Queries memory map the columns and only read the requested time window.
+
+        Args:
+            path: the directory of the store. Defaults to "restocks-prices".
+        """
+
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+
+        self._lock = threading.Lock()
+
+        self._skus = self._read_keys("skus.txt")
+        self._sku_index = {sku: i for i, sku in enumerate(self._skus)}
+        self._sizes = self._read_keys("sizes.txt")
+        self._size_index = {size: i for i, size in enumerate(self._sizes)}
+
+        # an interrupted append may leave some columns longer than the others, their partial rows are dropped
+        self._length = min(os.path.getsize(self._file(name)) // array(code).itemsize
+                           for name, code in _COLUMNS.items()) if os.path.exists(self._file("time")) else 0
+
+        for name, code in _COLUMNS.items():
+
+            with open(self._file(name), "ab") as f:
+
+                f.truncate(self._length * array(code).itemsize)
+
+        self._files = {name: open(self._file(name), "ab") for name in _COLUMNS}
+
+        self._last = 0.0
+
+        if self._length:
+
+            with self._map("time") as times:
+
+                self._last = times[self._length - 1]
+
+    def __len__(self) -> int:
+
+        return self._length
+
+    @property
+    def skus(self) -> list[str]:
+        """
+        The SKU codes of the recorded products.
+        """
+
+        return list(self._skus)
+
+    def append(self, product: Product, timestamp: float = None) -> None:
+        """
+        Records the variant prices of a product.
+
+        Args:
+            product: a product with its variants, as returned by `get_product`.
+            timestamp: the unix time of the prices. Defaults to now.
+        """
+
+        self.record(product.sku, {v.size: None if v.oos else v.price for v in product.variants or []}, timestamp)
+
+    def record(self, sku: str, prices: Mapping[str, Optional[int]], timestamp: float = None) -> None:
+        """
+        Records the prices of a product sizes.
+
+        Args:
+            sku: the product SKU code.
+            prices: the price of each size, None for the sizes out of stock.
+            timestamp: the unix time of the prices. Defaults to now.
+
+        Raises:
+            ValueError: if the timestamp is older than the last recorded prices.
+        """
+
+        if not prices:
+
+            return
+
+        with self._lock:
+
+            if timestamp is None:
+
+                # a clock set back must not break the time order
+                timestamp = max(time.time(), self._last)
+
+            elif timestamp < self._last:
+
+                raise ValueError("prices must be recorded in time order")
+
+            product = self._key(sku, self._skus, self._sku_index, "skus.txt")
+            sizes = array("h", [self._key(size, self._sizes, self._size_index, "sizes.txt") for size in prices])
+
+            columns = {
+                "time": array("d", [timestamp]) * len(sizes),
+                "product": array("i", [product]) * len(sizes),
+                "size": sizes,
+                "price": array("i", [_OOS if price is None else price for price in prices.values()]),
+            }
+
+            for name, values in columns.items():
+
+                values.tofile(self._files[name])
+                self._files[name].flush()
+
+            self._length += len(sizes)
+            self._last = timestamp
+
+    def extend(self, products: Iterable[Product], timestamp: float = None) -> None:
+
+        for product in products:
+
+            self.append(product, timestamp)
+
+    def range(self, sku: str, start: Union[datetime, float] = None, end: Union[datetime, float] = None, sizes: Iterable[str] = None) -> dict[str, PriceSeries]:
+        """
+        Gets the recorded prices of a product over a time window.
+
+        Args:
+            sku: the product SKU code.
+            start: the start of the window, included. Defaults to the first record.
+            end: the end of the window, excluded. Defaults to the last record.
+            sizes: the sizes to get. Defaults to all the recorded sizes.
+
+        Returns:
+            The `PriceSeries` of each size.
+        """
+
+        series = {}
+
+        for size, times, prices in self._select(sku, start, end, sizes):
+
+            series[size] = PriceSeries(times, [None if price == _OOS else price for price in prices])
+
+        return series
+
+    def aggregate(self, sku: str, start: Union[datetime, float] = None, end: Union[datetime, float] = None, sizes: Iterable[str] = None) -> dict[str, SizeStats]:
+        """
+        Aggregates the recorded prices of a product sizes over a time window.
+
+        Args:
+            sku: the product SKU code.
+            start: the start of the window, included. Defaults to the first record.
+            end: the end of the window, excluded. Defaults to the last record.
+            sizes: the sizes to aggregate. Defaults to all the recorded sizes.
+
+        Returns:
+            The `SizeStats` of each size.
+        """
+
+        stats = {}
+
+        for size, times, prices in self._select(sku, start, end, sizes):
+
+            in_stock = [price for price in prices if price != _OOS]
+
+            stats[size] = SizeStats(
+                count=len(prices),
+                in_stock=len(in_stock),
+                min=min(in_stock) if in_stock else None,
+                median=statistics.median(in_stock) if in_stock else None,
+                last=None if prices[-1] == _OOS else prices[-1],
+                last_time=times[-1]
+            )
+
+        return stats
+
+    def _select(self, sku: str, start: Optional[Union[datetime, float]], end: Optional[Union[datetime, float]], sizes: Optional[Iterable[str]]) -> Iterator[tuple[str, array, array]]:
+
+        with self._lock:
+
+            length = self._length
+            product = self._sku_index.get(sku)
+            wanted = None if sizes is None else {self._size_index.get(size) for size in sizes}
+
+        if product is None or not length:
+
+            return
+
+        rows: dict[int, tuple[array, array]] = {}
+
+        with ExitStack() as stack:
+
+            times, products, size_column, prices = (stack.enter_context(self._map(name)) for name in _COLUMNS)
+
+            lo = 0 if start is None else bisect.bisect_left(times, _timestamp(start), 0, length)
+            hi = length if end is None else bisect.bisect_left(times, _timestamp(end), lo, length)
+
+            # only the product column of the window is read in full, the other columns at the matching rows
+            for i, p in enumerate(products[lo:hi].tolist(), lo):
+
+                if p != product or (wanted is not None and size_column[i] not in wanted):
+
+                    continue
+
+                series = rows.get(size_column[i])
+
+                if series is None:
+
+                    series = rows[size_column[i]] = (array("d"), array("i"))
+
+                series[0].append(times[i])
+                series[1].append(prices[i])
+
+        for size, (series_times, series_prices) in rows.items():
+
+            yield self._sizes[size], series_times, series_prices
+
+    def _file(self, name: str) -> str:
+
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _map(self, name: str) -> Iterator[memoryview]:
+
+        with open(self._file(name), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+
+            with memoryview(m) as raw, raw.cast(_COLUMNS[name]) as view:
+
+                yield view
+
+    def _read_keys(self, name: str) -> list[str]:
+
+        if not os.path.exists(self._file(name)):
+
+            return []
+
+        with open(self._file(name), encoding="utf-8") as f:
+
+            return f.read().splitlines()
+
+    def _key(self, value: str, keys: list[str], index: dict[str, int], name: str) -> int:
+
+        i = index.get(value)
+
+        if i is None:
+
+            # the dictionary entry is written before the rows referencing it
+            with open(self._file(name), "a", encoding="utf-8") as f:
+
+                f.write(value + "\n")
+
+            i = index[value] = len(keys)
+
+            keys.append(value)
+
+        return i
+
+    def close(self) -> None:
+
+        with self._lock:
+
+            for f in self._files.values():
+
+                f.close()
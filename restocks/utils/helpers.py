@@ -1,11 +1,17 @@
 import re
+import sys
+from functools import lru_cache
+
+_DIGITS = re.compile(r'\d+')
 
 def parse_int(number_str: str) -> int:
         
-    return int(re.search(r'\d+', number_str.replace(".", "")).group(0))
+    return int(_DIGITS.search(number_str.replace(".", "")).group(0))
 
+# a page only holds a handful of distinct sizes, the results are interned so equal sizes share one string
+@lru_cache(maxsize=1024)
 def parse_size(size_str: str) -> str:
     
-    num = re.search(r'\d+', size_str).group(0)
+    num = _DIGITS.search(size_str).group(0)
     
-    return num + ".5" if (".5" in size_str or "½" in size_str) else num
\ No newline at end of file
+    return sys.intern(num + ".5" if (".5" in size_str or "½" in size_str) else num)
@@ -1,22 +1,175 @@
 import random
-from typing import Optional, Union
-from requests import Response
+import threading
+import time
+from typing import TYPE_CHECKING, Optional, Union
 from ..exceptions import RequestException
 
+if TYPE_CHECKING:
+    import requests
+
+class _ProxyStats():
+
+    def __init__(self) -> None:
+
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.latency = 0.0
+        self.error_rate = 0.0
+
+        self.failures = 0
+        self.strikes = 0
+        self.quarantined_until = 0.0
+
+    def score(self) -> float:
+
+        # seconds of average latency plus a penalty for recent errors, untested proxies score best so they get sampled
+        return self.latency + 10 * self.error_rate
+
 class _ProxyPool():
     
-    def __init__(self, proxy: Union[dict, list, None]) -> None:
+    def __init__(self, proxy: Union[dict, list, None], pool_size: int = 16, keep_alive: bool = True, max_failures: int = 3, cooldown: float = 30.0) -> None:
         
         match proxy:
             case dict(): self.pool = [proxy]
             case list(): self.pool = proxy
             case _: self.pool = [None]
+
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+
+        self._stats = {_proxy_key(p): _ProxyStats() for p in self.pool}
+        self._sticky = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
                 
-    def get_proxy(self) -> Optional[dict]:
-        
-        return random.choice(self.pool)
+    def get_proxy(self, sticky: str = None) -> Optional[dict]:
+
+        with self._lock:
+
+            now = time.monotonic()
+
+            if sticky is not None:
+
+                proxy = self._sticky.get(sticky, ...)
+
+                if proxy is not ... and self._stats[_proxy_key(proxy)].quarantined_until <= now:
+
+                    return proxy
+
+            healthy = [p for p in self.pool if self._stats[_proxy_key(p)].quarantined_until <= now]
+
+            if healthy:
+
+                # power of two choices, the best scored of two random healthy proxies
+                proxy = min(random.sample(healthy, min(2, len(healthy))), key=lambda p: self._stats[_proxy_key(p)].score())
+
+            else:
+
+                proxy = min(self.pool, key=lambda p: self._stats[_proxy_key(p)].quarantined_until)
+
+            if sticky is not None:
+
+                self._sticky[sticky] = proxy
+
+            return proxy
+
+    def get_session(self, proxy: Optional[dict]) -> "requests.Session":
+
+        key = _proxy_key(proxy)
+
+        session = self._sessions.get(key)
+
+        if session is None:
+
+            with self._lock:
+
+                session = self._sessions.get(key) or self._new_session(proxy)
+                self._sessions[key] = session
+
+        return session
+
+    def report(self, proxy: Optional[dict], latency: float, status_code: Optional[int]) -> None:
+
+        with self._lock:
+
+            stats = self._stats[_proxy_key(proxy)]
+
+            failed = status_code is None or status_code == 429 or status_code >= 500
+
+            stats.requests += 1
+            stats.errors += failed
+            stats.throttled += status_code == 429
+            stats.latency = latency if stats.requests == 1 else 0.8 * stats.latency + 0.2 * latency
+            stats.error_rate = 0.9 * stats.error_rate + 0.1 * failed
+
+            if not failed:
+
+                stats.failures = 0
+                stats.strikes = 0
+
+                return
+
+            stats.failures += 1
+
+            if status_code == 429 or stats.failures >= self.max_failures:
+
+                # the cooldown doubles each time the proxy is quarantined again without a success in between
+                stats.strikes += 1
+                stats.failures = 0
+                stats.quarantined_until = time.monotonic() + self.cooldown * 2 ** min(stats.strikes - 1, 5)
+
+    def stats(self) -> dict:
+
+        with self._lock:
+
+            now = time.monotonic()
+
+            return {key: {
+                "requests": s.requests,
+                "errors": s.errors,
+                "throttled": s.throttled,
+                "latency": s.latency,
+                "error_rate": s.error_rate,
+                "quarantined_for": max(0.0, s.quarantined_until - now),
+            } for key, s in self._stats.items()}
+
+    def _new_session(self, proxy: Optional[dict]) -> "requests.Session":
+
+        # requests is only imported by the first request, it makes up most of the client import time
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        session.proxies = proxy or {}
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        if not self.keep_alive:
+
+            session.headers["Connection"] = "close"
+
+        return session
+
+    def close(self) -> None:
+
+        with self._lock:
+
+            for session in self._sessions.values():
+
+                session.close()
+
+            self._sessions.clear()
     
-def validate_response(response: Response, status_code: int, msg: str = None) -> Response:
+def _proxy_key(proxy: Optional[dict]) -> str:
+
+    return (proxy.get("https") or proxy.get("http") or "direct") if proxy else "direct"
+
+def validate_response(response: "requests.Response", status_code: int, msg: str = None) -> "requests.Response":
 
     if response.status_code != status_code:
 
@@ -15,8 +15,9 @@ setup(
     author=about["__author__"],
     description=about["__description__"],
     license=about["__license__"],
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=["requests", "beautifulsoup4", "lxml"],
+    extras_require={"async": ["aiohttp"], "arrow": ["pyarrow"], "prometheus": ["prometheus-client"], "otel": ["opentelemetry-api"]},
     long_description=readme,
     long_description_content_type="text/markdown",
     keywords=["python", "client"],
@@ -0,0 +1,63 @@
+import time
+
+from restocks.catalog import CatalogIndex
+
+
+def _row(sku: str, price: str = "€ 200") -> dict:
+
+    return {"name": f"Sneaker {sku}", "id": "7", "storeprice": price,
+            "image": f"https://restocks.net/storage/products/{sku}/sneaker-1-1.png"}
+
+
+def test_get_is_case_insensitive():
+
+    catalog = CatalogIndex(":memory:")
+    catalog.update([_row("FD1437-612")])
+
+    assert catalog.get(" fd1437-612 ").sku == "FD1437-612"
+    assert catalog.get("Fd1437-612").sku == "FD1437-612"
+
+
+def test_stale_entries_are_not_returned(tmp_path):
+
+    path = str(tmp_path / "catalog.sqlite")
+
+    catalog = CatalogIndex(path, max_age=60)
+    catalog.update([_row("FD1437-612")])
+    catalog.close()
+
+    catalog = CatalogIndex(path, max_age=60)
+
+    assert catalog.get("FD1437-612") is not None
+
+    catalog._updated["FD1437-612"] -= 120
+
+    assert catalog.get("FD1437-612") is None
+
+    # seeing the product again, even unchanged, makes it fresh
+    catalog.update([_row("FD1437-612")])
+
+    assert catalog.get("FD1437-612") is not None
+    assert CatalogIndex(path, max_age=60)._updated["FD1437-612"] > time.time() - 60
+
+
+def test_entries_never_expire_without_max_age():
+
+    catalog = CatalogIndex(":memory:", max_age=None)
+    catalog.update([_row("FD1437-612")])
+
+    catalog._updated["FD1437-612"] -= 10 * 365 * 86400
+
+    assert catalog.get("FD1437-612") is not None
+
+
+def test_prefix_and_search_skip_stale_entries():
+
+    catalog = CatalogIndex(":memory:", max_age=60)
+    catalog.update([_row("FD1437-612"), _row("DD1391-100")])
+
+    catalog._updated["FD1437-612"] -= 120
+
+    assert [e.sku for e in catalog.prefix("sneaker")] == ["DD1391-100"]
+    assert catalog.prefix("fd1437") == []
+    assert [e.sku for e in catalog.search("sneakr")] == ["DD1391-100"]
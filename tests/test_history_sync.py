@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from restocks.client import AsyncClient, Client
+from restocks.client.pagination import PAGE_SIZE
+from restocks.history import HistoryStore
+
+
+def _sale(n: int) -> dict:
+
+    return {"name": f"Sneaker {n}", "size": "42", "id": f"#{n}", "storeprice": "€ 200", "date": "14/06/23",
+            "image": f"https://restocks.net/storage/products/SKU-{n}/sneaker-{n}-1-1.png"}
+
+
+def _pages(*pages: list[int]) -> dict[int, list[dict]]:
+
+    return {i: [_sale(n) for n in page] for i, page in enumerate(pages, 1)}
+
+
+class _Pages:
+
+    """
+    Serves fixed sales history pages, recording the fetched page numbers and failing on the given ones.
+    """
+
+    def __init__(self, pages: dict[int, list[dict]], fail: set[int] = ()) -> None:
+
+        self.pages = pages
+        self.fail = set(fail)
+        self.fetched = []
+
+    def __call__(self, query: str, page: int) -> list[dict]:
+
+        self.fetched.append(page)
+
+        if page in self.fail:
+
+            raise ConnectionError("page failed")
+
+        return self.pages.get(page, [])
+
+
+@pytest.fixture
+def store():
+
+    store = HistoryStore(":memory:")
+
+    yield store
+
+    store.close()
+
+
+def _client(pages: _Pages) -> Client:
+
+    client = Client()
+    client._sales_history_page = pages
+
+    return client
+
+
+def test_failed_page_stores_nothing(store):
+
+    first = _Pages(_pages(range(100, 100 - PAGE_SIZE, -1), range(52, 40, -1)), fail={2})
+
+    with pytest.raises(ConnectionError):
+
+        _client(first).sync_sales_history(store)
+
+    assert store.rows("sales") == []
+    assert store.watermark("sales") is None
+
+    retry = _Pages(first.pages)
+
+    synced = _client(retry).sync_sales_history(store)
+
+    assert len(synced) == PAGE_SIZE + 12
+    assert len(store.rows("sales")) == PAGE_SIZE + 12
+    assert store.watermark("sales")[0] == "#100"
+
+
+def test_stops_at_the_previous_watermark(store):
+
+    _client(_Pages(_pages(range(100, 100 - PAGE_SIZE, -1), range(52, 40, -1)))).sync_sales_history(store)
+
+    # one new sale pushes the previous newest sale down the first page
+    pages = _Pages(_pages(range(101, 101 - PAGE_SIZE, -1), range(53, 40, -1)))
+
+    synced = _client(pages).sync_sales_history(store)
+
+    assert [p.id for p in synced] == [101]
+    assert pages.fetched == [1]
+    assert store.watermark("sales")[0] == "#101"
+
+
+def test_stops_at_the_first_page_without_new_rows(store):
+
+    old = _pages(range(100, 100 - PAGE_SIZE, -1), range(52, 4, -1), range(4, 0, -1))
+
+    _client(_Pages(old)).sync_sales_history(store)
+
+    # without a watermark, paging can only stop at a page without new rows
+    store.commit("sales", [], None)
+
+    pages = _Pages(old)
+
+    assert _client(pages).sync_sales_history(store) == []
+    assert pages.fetched == [1]
+
+
+def test_full_sync_walks_every_page(store):
+
+    old = _pages(range(100, 100 - PAGE_SIZE, -1), range(52, 4, -1), range(4, 0, -1))
+
+    _client(_Pages(old)).sync_sales_history(store)
+
+    pages = _Pages(old)
+
+    assert _client(pages).sync_sales_history(store, full=True) == []
+    assert pages.fetched == [1, 2, 3]
+
+
+def test_async_failed_page_stores_nothing(store):
+
+    pages = _Pages(_pages(range(100, 100 - PAGE_SIZE, -1), range(52, 40, -1)), fail={2})
+
+    async def fetch(query: str, page: int) -> list[dict]:
+
+        return pages(query, page)
+
+    async def sync() -> list:
+
+        async with AsyncClient() as client:
+
+            client._sales_history_page = fetch
+
+            return await client.sync_sales_history(store)
+
+    with pytest.raises(ConnectionError):
+
+        asyncio.run(sync())
+
+    assert store.rows("sales") == []
+
+    pages.fail.clear()
+
+    assert len(asyncio.run(sync())) == PAGE_SIZE + 12
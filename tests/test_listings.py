@@ -0,0 +1,71 @@
+import pytest
+
+from restocks.client import Client
+from restocks.exceptions import SessionException
+from restocks.product import Product
+
+
+def _product() -> Product:
+
+    return Product._from_json({"name": "Sneaker", "id": "7", "storeprice": "€ 200",
+                               "image": "https://restocks.net/storage/products/SKU-1/sneaker-1-1.png"})
+
+
+def _client(validation: dict) -> tuple[Client, list]:
+
+    created = []
+
+    client = Client()
+    client._get_sell_profit = lambda store_price, sell_method: 171.0
+    client._validate_listing_request = lambda *args: validation
+    client._create_listing_request = lambda **kwargs: created.append(kwargs) or {"redirectUrl": "/en/account/sell/success"}
+
+    return client, created
+
+
+def test_rejected_listing_is_not_created():
+
+    client, created = _client({"success": False, "message": "price too low"})
+
+    with pytest.raises(SessionException, match="price too low"):
+
+        client._create_listing(_product(), 200, "42", "resale", 60, validate=True)
+
+    assert created == []
+
+
+def test_validated_listing_is_created():
+
+    client, created = _client({"success": True})
+
+    assert client._create_listing(_product(), 200, "42", "resale", 60, validate=True)
+    assert len(created) == 1
+
+
+def test_skus_are_resolved_from_one_search_each():
+
+    client, created = _client({"success": True})
+
+    searches = []
+
+    def search(query: str, page: int) -> dict:
+
+        searches.append(query)
+
+        return {"data": [{"name": "Sneaker", "id": "7", "storeprice": "€ 200",
+                          "image": f"https://restocks.net/storage/products/{query}/sneaker-1-1.png"}]}
+
+    def product_page(slug: str) -> str:
+
+        raise AssertionError("listing must not fetch the product page")
+
+    client._search_product_request = search
+    client._product_request = product_page
+
+    listings = [{"product": sku, "store_price": 200, "size": "42", "sell_method": "resale", "duration": 60}
+                for sku in ("SKU-1", "SKU-2", "SKU-1")]
+
+    assert all(r.ok and r.value for r in client.list_products(listings, validate=False))
+    assert sorted(searches) == ["SKU-1", "SKU-2"]
+    assert client.list_product("SKU-3", 200, "42", "resale", 60)
+    assert len(created) == 4
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from restocks.client import AsyncClient, Client
+from restocks.exceptions import LoginException
+
+
+def _pages(client, main_page_token: str = None) -> None:
+
+    async def page(value):
+
+        return value
+
+    wrap = page if isinstance(client, AsyncClient) else (lambda value: value)
+
+    client._set_locale_request = lambda: wrap(None)
+    client._login_page_request = lambda: wrap("login")
+    client._login_with_token_request = lambda csrf_token, email, password: wrap("welcome")
+    client._main_page_request = lambda: wrap("main")
+    client._csrf_token_parsing = lambda src: wrap("csrf" if src == "login" else main_page_token)
+
+
+def test_missing_session_token_fails_the_login():
+
+    client = Client()
+    _pages(client)
+
+    with pytest.raises(LoginException, match="session token not found"):
+
+        client.login("user@restocks.net", "password")
+
+    assert client._session_token is None
+
+
+def test_async_missing_session_token_fails_the_login():
+
+    async def login() -> None:
+
+        async with AsyncClient() as client:
+
+            _pages(client)
+
+            await client.login("user@restocks.net", "password")
+
+    with pytest.raises(LoginException, match="session token not found"):
+
+        asyncio.run(login())
+
+
+def test_session_token_is_kept():
+
+    client = Client()
+    _pages(client, "token")
+
+    client.login("user@restocks.net", "password")
+
+    assert client._session_token == "token"
@@ -0,0 +1,82 @@
+import threading
+
+from restocks.client import Client
+from restocks.client.core import _Memo
+
+
+class _Response:
+
+    def __init__(self, status_code: int, text: str = "", headers: dict = None) -> None:
+
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+def test_concurrent_inserts_stay_bounded():
+
+    memo = _Memo(64)
+    errors = []
+
+    def insert(offset: int) -> None:
+
+        try:
+
+            for i in range(1000):
+
+                memo.set((offset, i), i)
+
+        except Exception as e:
+
+            errors.append(e)
+
+    threads = [threading.Thread(target=insert, args=(n,)) for n in range(8)]
+
+    for thread in threads:
+
+        thread.start()
+
+    for thread in threads:
+
+        thread.join()
+
+    assert errors == []
+    assert len(memo) == 64
+
+
+def test_least_recently_used_entry_goes_first():
+
+    memo = _Memo(2)
+
+    memo.set("a", 1)
+    memo.set("b", 2)
+    memo.get("a")
+    memo.set("c", 3)
+
+    assert memo.get("b") is None
+    assert memo.get("a") == 1
+
+    # refreshing an entry also makes it the most recently used
+    memo.set("a", 4)
+    memo.set("d", 5)
+
+    assert memo.get("c") is None
+    assert memo.get("a") == 4
+
+
+def test_memo_size_is_per_client():
+
+    assert Client(memo_size=10)._validators.maxsize == 10
+    assert Client()._parsed.maxsize == 1024
+
+
+def test_not_modified_answer_survives_an_evicted_validator():
+
+    client = Client(memo_size=1)
+
+    validator = ("etag", None, "<sizes>")
+
+    client._validators.set("other", ("etag", None, "<other>"))
+
+    assert client._product_response("slug", _Response(304), validator) == "<sizes>"
+    assert client._validators.get("slug") == validator
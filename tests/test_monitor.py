@@ -0,0 +1,51 @@
+from restocks.client import ChangeKind, Client, Monitor
+from restocks.product import Product
+
+
+def _monitor(pages: list[dict]) -> Monitor:
+
+    client = Client()
+    client.get_product = lambda sku: Product._from_json({
+        "name": "Sneaker", "id": "7", "storeprice": "€ 200", "variants": {"42": 200, "43": 250},
+        "image": f"https://restocks.net/storage/products/{sku}/sneaker-1-1.png"})
+
+    pages = iter(pages)
+
+    client._product_request = lambda slug: slug
+    client._product_parsing = lambda src: next(pages)
+    client._record_prices = lambda sku, sizes: None
+
+    monitor = Monitor(client)
+    monitor.watch("SKU-1")
+
+    return monitor
+
+
+def _poll(monitor: Monitor) -> list:
+
+    for item in monitor._items.values():
+
+        item.due = 0
+
+    return monitor.poll()
+
+
+def test_changes_carry_the_polled_product():
+
+    monitor = _monitor([{"42": 180, "43": 250}, {"42": 180, "43": 0}])
+
+    assert _poll(monitor) == []
+
+    moved, = _poll(monitor)
+
+    assert moved.kind == ChangeKind.PriceMoved
+    assert moved.product.price == 180
+    assert {v.size: v.price for v in moved.product.variants} == {"42": 180, "43": 250}
+
+    oos, = _poll(monitor)
+
+    assert oos.kind == ChangeKind.WentOOS
+    assert [v.oos for v in oos.product.variants] == [False, True]
+
+    # the changes already reported are left as they were
+    assert [v.oos for v in moved.product.variants] == [False, False]
@@ -0,0 +1,58 @@
+import asyncio
+
+from restocks.client import AsyncClient, Client
+from restocks.product import Product, Variant
+
+
+def _product(id: int, variants: dict = None) -> Product:
+
+    product = Product._from_json({"name": f"Sneaker {id}", "id": str(id), "storeprice": "€ 200",
+                                  "image": f"https://restocks.net/storage/products/SKU-{id}/sneaker-{id}-1-1.png"})
+
+    if variants is not None:
+
+        product.variants = list(Variant._from_json(variants))
+
+    return product
+
+
+def _lowest_price(product_id: int, size: str) -> int:
+
+    if size == "43":
+
+        raise ConnectionError("lowest price failed")
+
+    return product_id * 10
+
+
+def test_failed_sizes_are_reported_apart_from_out_of_stock_sizes():
+
+    client = Client()
+    client.get_size_lowest_price = _lowest_price
+
+    matrix = client.get_lowest_price_matrix([_product(1, {"42": None}), 2], ["42", "43"])
+
+    assert matrix.prices == {1: {"42": None, "43": None}, 2: {"42": 20, "43": None}}
+    assert set(matrix.errors) == {1, 2}
+    assert isinstance(matrix.errors[1]["43"], ConnectionError)
+    assert "42" not in matrix.errors[1]
+
+
+def test_async_matrix_matches_the_sync_one():
+
+    async def lowest_price(product_id: int, size: str) -> int:
+
+        return _lowest_price(product_id, size)
+
+    async def matrix():
+
+        async with AsyncClient() as client:
+
+            client.get_size_lowest_price = lowest_price
+
+            return await client.get_lowest_price_matrix([_product(1, {"42": 150}), 2], ["42", "43"])
+
+    prices, errors = asyncio.run(matrix())
+
+    assert prices == {1: {"42": 150, "43": None}, 2: {"42": 20, "43": None}}
+    assert set(errors) == {1, 2}